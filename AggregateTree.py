@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+@author: Michael Lin
+"""
+import operator
+
+from RedBlackBinaryTree.RedBlackBinaryTree import AugmentedRedBlackTree, Node
+
+# Summary of an empty subtree, kept apart from every real value so that no identity element is needed
+_EMPTY = object()
+
+# Built-in reducers: (associative function, result of an empty range, whether each node counts as 1)
+_REDUCERS = {
+    'sum': (operator.add, 0, False),
+    'min': (min, None, False),
+    'max': (max, None, False),
+    'count': (operator.add, 0, True),
+}
+
+
+class AggregateNode(Node):
+    __slots__ = ('agg',)
+
+    def __init__(self, val):
+        super(AggregateNode, self).__init__(val)
+        # Reduction of the payloads of the subtree rooted here, in key order
+        self.agg = _EMPTY
+
+
+class AggregateTree(AugmentedRedBlackTree):
+    """
+    Red black map augmented with a monoid summary of its subtrees, so that the reduction of the
+    payloads between two keys takes O(log n) instead of a walk over the range
+    The reducer is one of 'sum', 'min', 'max', 'count' or any associative function of two payloads,
+    it does not have to be commutative. Nodes without a payload (set-style insert) contribute nothing
+    """
+    _node_class = AggregateNode
+
+    def __init__(self, reducer='sum', identity=None, key=None):
+        super(AggregateTree, self).__init__(key)
+        if reducer in _REDUCERS:
+            self._reducer, self._identity, self._counts = _REDUCERS[reducer]
+        elif callable(reducer):
+            self._reducer, self._identity, self._counts = reducer, identity, False
+        else:
+            raise ValueError("Unknown reducer {}".format(reducer))
+        self._reducer_spec = reducer
+
+    def __setitem__(self, key, value):
+        sort_key = self._sort_key(key)
+        node = self._find_key(sort_key)
+        if node is None:
+            # The payload has to be in place before the node is linked and summarized
+            node = self._new_leaf(key, sort_key)
+            node.value = value
+            self._insert_node(node)
+        else:
+            node.value = value
+            self._update_path(node)
+
+    def setdefault(self, key, default=None):
+        sort_key = self._sort_key(key)
+        node = self._find_key(sort_key)
+        if node is None:
+            node = self._new_leaf(key, sort_key)
+            node.value = default
+            self._insert_node(node)
+        return node.value
+
+    def aggregate(self, lo=None, hi=None, inclusive=(True, True)):
+        """
+        Reduction of the payloads whose keys lie between lo and hi, in key order
+        Only the two search paths are visited, whole subtrees in range contribute their summary
+        :param lo: lower bound, None for unbounded
+        :param hi: upper bound, None for unbounded
+        :param inclusive: pair of booleans telling whether lo and hi themselves are included
+        :return: reduced payload, the identity if nothing in range has a payload
+        """
+        lo_inclusive, hi_inclusive = inclusive
+        lo_key = None if lo is None else self._sort_key(lo)
+        hi_key = None if hi is None else self._sort_key(hi)
+
+        def above_lo(key):
+            return lo is None or (not key < lo_key if lo_inclusive else lo_key < key)
+
+        def below_hi(key):
+            return hi is None or (not hi_key < key if hi_inclusive else key < hi_key)
+
+        # Descend to the highest node in range, where the paths to lo and hi part
+        node = self.root
+        while node is not self.null_node:
+            if not above_lo(node.key):
+                node = node.right
+            elif not below_hi(node.key):
+                node = node.left
+            else:
+                break
+        if node is self.null_node:
+            return self._identity
+
+        # Below the split node on the left everything is under hi, only lo cuts
+        left = _EMPTY
+        curr = node.left
+        while curr is not self.null_node:
+            if above_lo(curr.key):
+                left = self._combine(self._combine(self._measure(curr), curr.right.agg), left)
+                curr = curr.left
+            else:
+                curr = curr.right
+        # And on the right only hi cuts
+        right = _EMPTY
+        curr = node.right
+        while curr is not self.null_node:
+            if below_hi(curr.key):
+                right = self._combine(right, self._combine(curr.left.agg, self._measure(curr)))
+                curr = curr.right
+            else:
+                curr = curr.left
+
+        result = self._combine(self._combine(left, self._measure(node)), right)
+        return self._identity if result is _EMPTY else result
+
+    def _combine(self, a, b):
+        if a is _EMPTY:
+            return b
+        if b is _EMPTY:
+            return a
+        return self._reducer(a, b)
+
+    def _measure(self, node):
+        if self._counts:
+            return 1
+        return _EMPTY if node.value is None else node.value
+
+    def _spawn(self, null_node):
+        tree = type(self)(self._reducer_spec, self._identity, self.key)
+        tree.null_node = null_node
+        tree.root = null_node
+        return tree
+
+    def _merge_operation(self, other, keep_self, keep_other, keep_both):
+        if other._reducer_spec != self._reducer_spec:
+            raise ValueError("Set operations need trees with the same reducer")
+        return super(AggregateTree, self)._merge_operation(other, keep_self, keep_other, keep_both)
+
+    def _refresh(self, node):
+        node.agg = self._combine(self._combine(node.left.agg, self._measure(node)), node.right.agg)
+
+
+def main():
+    ag_test_tree = AggregateTree('sum')
+    for day, amount in [(55, 10), (40, 3), (30, 7), (35, 1), (70, 4), (65, 2)]:
+        ag_test_tree[day] = amount
+    print("Sum over [35, 60]: {}".format(ag_test_tree.aggregate(35, 60)))
+    ag_test_tree[40] = 20
+    print("After update: {}".format(ag_test_tree.aggregate(35, 60)))
+    print("Whole tree: {}".format(ag_test_tree.aggregate()))
+
+
+if __name__ == '__main__':
+    main()
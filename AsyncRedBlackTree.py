@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+@author: Michael Lin
+"""
+import asyncio
+import collections
+
+from RedBlackBinaryTree.RedBlackBinaryTree import RedBlackBinaryTree
+
+
+class AsyncRedBlackTree:
+    """
+    asyncio front of a RedBlackBinaryTree
+    Requests arriving within window seconds are coalesced, then each run of consecutive requests
+    of the same kind is applied as one sorted batch (contains_many, insert_many, delete_many)
+    A run that fails without changing the tree is retried request by request, so a bad key
+    only fails its own caller
+    At most max_pending requests can be queued, further callers wait until earlier ones complete
+    """
+    def __init__(self, tree=None, window=0.0005, max_pending=10000, max_batch=4096, executor=None):
+        super(AsyncRedBlackTree, self).__init__()
+        self._tree = RedBlackBinaryTree() if tree is None else tree
+        self._window = window
+        self._max_batch = max_batch
+        # Batches run on the event loop unless an executor is given
+        self._executor = executor
+        self._max_pending = max_pending
+        # Requests queued or being applied, and callers waiting for room
+        self._queued = 0
+        self._waiters = collections.deque()
+        self._pending = []
+        self._flush_handle = None
+        self._apply_lock = asyncio.Lock()
+        # Executor batches in flight, the event loop only keeps weak references to its tasks
+        self._tasks = set()
+
+    def __len__(self):
+        return len(self._tree)
+
+    # The request methods hand back the _submit coroutine directly, saving a coroutine per call
+    def contains(self, key):
+        """
+        Membership test
+        :param key: number
+        :return: awaitable Boolean
+        """
+        return self._submit('contains', key)
+
+    def insert(self, key):
+        """
+        Insertion
+        :param key: number to be inserted
+        :return: awaitable None
+        """
+        return self._submit('insert', key)
+
+    def delete(self, key):
+        """
+        Removal, keys that are not in the tree are ignored
+        :param key: number to be removed
+        :return: awaitable None
+        """
+        return self._submit('delete', key)
+
+    def range(self, lo=None, hi=None, inclusive=(True, True)):
+        """
+        Range query, ordered with respect to the writes queued around it
+        :param lo: lower bound, None for unbounded
+        :param hi: upper bound, None for unbounded
+        :param inclusive: pair of booleans telling whether lo and hi themselves are included
+        :return: awaitable list of values between lo and hi
+        """
+        return self._submit('range', (lo, hi, inclusive))
+
+    async def _submit(self, op, arg):
+        """
+        Queue a request and wait for the batch holding it
+        :param op: one of contains/insert/delete/range
+        :param arg: key, or bounds for range
+        :return: result of the request
+        """
+        loop = asyncio.get_running_loop()
+        # Backpressure: wait for room in the queue
+        while self._queued >= self._max_pending:
+            waiter = loop.create_future()
+            self._waiters.append(waiter)
+            await waiter
+        self._queued += 1
+        future = loop.create_future()
+        self._pending.append((op, arg, future))
+        if len(self._pending) >= self._max_batch:
+            if self._flush_handle is not None:
+                self._flush_handle.cancel()
+            self._flush_handle = None
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._window, self._flush)
+        return await future
+
+    def _flush(self):
+        """
+        Hand the queued requests over as one batch
+        :return: None
+        """
+        self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        if self._executor is None:
+            self._apply(batch)
+        else:
+            task = asyncio.ensure_future(self._apply_in_executor(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _apply_in_executor(self, batch):
+        # Batches must not overlap, the tree itself is not thread-safe
+        async with self._apply_lock:
+            loop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(self._executor, self._apply_runs, batch)
+            except Exception as error:
+                self._finish(batch, error)
+                return
+        self._finish(batch)
+
+    def _apply(self, batch):
+        try:
+            self._apply_runs(batch)
+        except Exception as error:
+            self._finish(batch, error)
+            return
+        self._finish(batch)
+
+    def _apply_runs(self, batch):
+        """
+        Apply consecutive requests of the same kind together, keeping the arrival order between runs
+        :param batch: list of (op, arg, future)
+        :return: None, (error, result, future) is stored in place of each request
+        """
+        start = 0
+        while start < len(batch):
+            op = batch[start][0]
+            stop = start
+            while stop < len(batch) and batch[stop][0] == op:
+                stop += 1
+            run = batch[start:stop]
+            size = len(self._tree)
+            try:
+                outcomes = [(None, result) for result in self._apply_run(op, [arg for _, arg, _ in run])]
+            except Exception as error:
+                if len(run) == 1 or len(self._tree) != size:
+                    # Part of the run may be in, which request failed can no longer be told
+                    outcomes = [(error, None)] * len(run)
+                else:
+                    outcomes = [self._apply_alone(op, arg) for _, arg, _ in run]
+            for i, (error, result) in enumerate(outcomes):
+                batch[start + i] = (error, result, run[i][2])
+            start = stop
+
+    def _apply_run(self, op, args):
+        """
+        Apply a run of requests of the same kind as one batch
+        :param op: one of contains/insert/delete/range
+        :param args: argument of each request
+        :return: list of results
+        """
+        if op == 'contains':
+            return self._tree.contains_many(args)
+        if op == 'insert':
+            self._tree.insert_many(args)
+        elif op == 'delete':
+            self._tree.delete_many(args)
+        else:
+            return [list(self._tree.irange(lo, hi, inclusive)) for lo, hi, inclusive in args]
+        return [None] * len(args)
+
+    def _apply_alone(self, op, arg):
+        """
+        Apply a single request
+        :param op: one of contains/insert/delete/range
+        :param arg: argument of the request
+        :return: (error, result), error None on success
+        """
+        try:
+            return None, self._apply_run(op, [arg])[0]
+        except Exception as error:
+            return error, None
+
+    def _finish(self, batch, error=None):
+        """
+        Resolve the futures of a batch and free their queue slots
+        :param batch: list of (error, result, future) once applied
+        :param error: exception raised while applying the batch, passed on to every request
+        :return: None
+        """
+        for request_error, result, future in batch:
+            if not future.done():
+                if error is not None:
+                    future.set_exception(error)
+                elif request_error is not None:
+                    future.set_exception(request_error)
+                else:
+                    future.set_result(result)
+        self._queued -= len(batch)
+        room = self._max_pending - self._queued
+        while room > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                room -= 1
+
+
+async def _demo():
+    as_test_tree = AsyncRedBlackTree()
+    await asyncio.gather(*[as_test_tree.insert(num) for num in (55, 40, 30, 35)])
+    print(await asyncio.gather(as_test_tree.contains(30), as_test_tree.contains(50)))
+    print(await as_test_tree.range(30, 50))
+
+
+def main():
+    asyncio.run(_demo())
+
+
+if __name__ == '__main__':
+    main()
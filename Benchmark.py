@@ -0,0 +1,866 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+@author: Michael Lin
+"""
+import argparse
+import asyncio
+import bisect
+import collections
+import functools
+import gc
+import heapq
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+try:
+    import sortedcontainers
+except ImportError:
+    sortedcontainers = None
+
+from RedBlackBinaryTree.AggregateTree import AggregateTree
+from RedBlackBinaryTree.AsyncRedBlackTree import AsyncRedBlackTree
+from RedBlackBinaryTree.BoundedRedBlackTree import BoundedRedBlackTree
+from RedBlackBinaryTree.ConcurrentRedBlackTree import ConcurrentRedBlackTree
+from RedBlackBinaryTree.IntervalTree import IntervalTree
+from RedBlackBinaryTree.MappedRedBlackTree import MappedRedBlackTree
+from RedBlackBinaryTree.OrderStatisticTree import OrderStatisticTree
+from RedBlackBinaryTree.PersistentRedBlackTree import PersistentRedBlackTree
+from RedBlackBinaryTree.RedBlackBinaryTree import Node, RedBlackBinaryTree
+from RedBlackBinaryTree.RedBlackMultiset import RedBlackMultiset
+from RedBlackBinaryTree.ShardedRedBlackTree import ShardedRedBlackTree
+from RedBlackBinaryTree.TreePriorityQueue import TreePriorityQueue
+
+
+class DictNode:
+    # Node layout before __slots__ were introduced, kept as the memory baseline
+    def __init__(self, val):
+        super(DictNode, self).__init__()
+        self.parent = None
+        self.left = None
+        self.right = None
+        self.val = val
+        self.color = 1
+
+
+def _traced_bytes(build):
+    """
+    Measure the memory held by whatever build() returns
+    :param build: zero-argument callable creating the structure
+    :return: bytes allocated and still alive after build()
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    held = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del held
+    return after - before
+
+
+def memory_benchmark(n=100000):
+    """
+    Bytes per key of the tree against the dict-backed node layout
+    The node lists hold an 8-byte pointer per node on top of the nodes themselves
+    :param n: number of keys
+    :return: dictionary {layout: bytes per key}
+    """
+    keys = random.sample(range(n * 10), n)
+
+    def build_tree():
+        tree = RedBlackBinaryTree()
+        for key in keys:
+            tree.insert(key)
+        return tree
+
+    results = {
+        'DictNode': _traced_bytes(lambda: [DictNode(key) for key in keys]) / n,
+        'Node': _traced_bytes(lambda: [Node(key) for key in keys]) / n,
+        'RedBlackBinaryTree': _traced_bytes(build_tree) / n,
+    }
+    return results
+
+
+def _timed(func, *args):
+    """
+    Wall clock time of a single call, garbage collection disabled like timeit does
+    :param func: callable
+    :param args: arguments of func
+    :return: seconds taken
+    """
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        func(*args)
+        return time.perf_counter() - start
+    finally:
+        gc.enable()
+
+
+def _insert_all(keys, tree_class=RedBlackBinaryTree):
+    tree = tree_class()
+    for key in keys:
+        tree.insert(key)
+    return tree
+
+
+def bulk_load_benchmark(n=100000):
+    """
+    Bulk-loading constructors against repeated insert()
+    :param n: number of keys
+    :return: dictionary {method: seconds}
+    """
+    keys = random.sample(range(n * 10), n)
+    sorted_keys = sorted(keys)
+    return {
+        'insert loop': _timed(_insert_all, keys),
+        'from_sorted': _timed(RedBlackBinaryTree.from_sorted, sorted_keys),
+        'from_iterable': _timed(RedBlackBinaryTree.from_iterable, keys),
+    }
+
+
+def _delete_all(tree, keys):
+    for key in keys:
+        tree.delete(tree.root, key)
+
+
+def batch_benchmark(n=100000, batch_sizes=(1000, 10000, 100000, 1000000)):
+    """
+    insert_many/delete_many against per-key loops on a tree of n keys
+    :param n: number of keys already in the tree
+    :param batch_sizes: sizes of the batches
+    :return: dictionary {method and batch size: keys per second}
+    """
+    base = random.sample(range(n * 10), n)
+    results = {}
+    for size in batch_sizes:
+        batch = [random.randrange(n * 10) for _ in range(size)]
+        # Only delete keys that are present so that the loop never hits "Node not found"
+        present = random.sample(base, min(size, n))
+        for name, func, args in (
+                ('insert loop', lambda tree, keys: [tree.insert(key) for key in keys], batch),
+                ('insert_many', RedBlackBinaryTree.insert_many, batch),
+                ('delete loop', _delete_all, present),
+                ('delete_many', RedBlackBinaryTree.delete_many, present)):
+            tree = RedBlackBinaryTree.from_iterable(base)
+            results['{} {}'.format(name, size)] = len(args) / _timed(func, tree, args)
+    return results
+
+
+def order_statistic_benchmark(n=100000):
+    """
+    Cost of maintaining subtree sizes on the mutation path
+    :param n: number of keys
+    :return: dictionary {tree and operation: seconds}
+    """
+    keys = random.sample(range(n * 10), n)
+    results = {}
+    for tree_class in (RedBlackBinaryTree, OrderStatisticTree):
+        name = tree_class.__name__
+        results[name + ' insert'] = _timed(_insert_all, keys, tree_class)
+        tree = tree_class.from_iterable(keys)
+        results[name + ' delete'] = _timed(_delete_all, tree, keys)
+    tree = OrderStatisticTree.from_iterable(keys)
+    positions = range(0, n, n // 10)
+    results['select x10'] = _timed(lambda: [tree.select(i) for i in positions])
+    results['inorder list x10'] = _timed(lambda: [tree.inorder_print_tree()[i] for i in positions])
+    return results
+
+
+def lookup_benchmark(n=100000, probes=10000):
+    """
+    contains_many against a loop of membership tests
+    :param n: number of keys in the tree
+    :param probes: number of keys looked up per call
+    :return: dictionary {method and probe distribution: keys per second}
+    """
+    tree = RedBlackBinaryTree.from_iterable(random.sample(range(n * 10), n))
+    start = random.randrange(n * 10)
+    results = {}
+    for name, keys in (('random', [random.randrange(n * 10) for _ in range(probes)]),
+                       ('clustered', [start + i for i in range(probes)])):
+        results['in loop ' + name] = probes / _timed(lambda: [key in tree for key in keys])
+        results['contains_many ' + name] = probes / _timed(tree.contains_many, keys)
+    return results
+
+
+def concurrency_benchmark(n=100000, thread_counts=(1, 2, 4, 8), duration=1.0, write_ratio=0.1):
+    """
+    Read and write throughput of ConcurrentRedBlackTree as threads are added
+    :param n: number of keys in the tree
+    :param thread_counts: numbers of threads to run
+    :param duration: seconds each run lasts
+    :param write_ratio: share of the operations that insert or delete
+    :return: dictionary {operation and thread count: operations per second}
+    """
+    results = {}
+    for count in thread_counts:
+        tree = ConcurrentRedBlackTree(RedBlackBinaryTree.from_iterable(range(0, n * 2, 2)))
+        reads = [0] * count
+        writes = [0] * count
+        stop = time.perf_counter() + duration
+
+        def worker(index):
+            rng = random.Random(index)
+            while time.perf_counter() < stop:
+                key = rng.randrange(n * 2)
+                if rng.random() < write_ratio:
+                    # Inserts add odd keys while deletes remove even keys of the initial tree
+                    if key % 2:
+                        tree.insert(key)
+                    else:
+                        tree.delete_many([key])
+                    writes[index] += 1
+                else:
+                    key in tree
+                    reads[index] += 1
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        results['reads {} threads'.format(count)] = sum(reads) / duration
+        results['writes {} threads'.format(count)] = sum(writes) / duration
+    return results
+
+
+def persistent_benchmark(n=100000, versions=1000):
+    """
+    Copy-on-write snapshots against rebuilding a copy of the tree
+    :param n: number of keys in the tree
+    :param versions: number of snapshots taken
+    :return: dictionary {method: microseconds per version}
+    """
+    keys = random.sample(range(n * 10), n)
+    tree = PersistentRedBlackTree.from_iterable(keys)
+    copy_runs = max(1, versions // 100)
+    scale = 1e6 / versions
+    new_keys = [random.randrange(n * 10) for _ in range(versions)]
+
+    def snapshot_and_insert():
+        for key in new_keys:
+            tree.snapshot()
+            tree.insert(key)
+
+    return {
+        'snapshot': _timed(lambda: [tree.snapshot() for _ in range(versions)]) * scale,
+        'snapshot + insert': _timed(snapshot_and_insert) * scale,
+        'insert only': _timed(lambda: [tree.insert(key) for key in new_keys]) * scale,
+        'rebuilt copy': _timed(lambda: [RedBlackBinaryTree.from_sorted(tree) for _ in range(copy_runs)]) * 1e6 / copy_runs,
+    }
+
+
+def async_benchmark(n=100000, coroutines=5000):
+    """
+    Batched AsyncRedBlackTree lookups against one tree call per await
+    :param n: number of keys in the tree
+    :param coroutines: number of concurrent coroutines, each doing one lookup
+    :return: dictionary {method: lookups per second}
+    """
+    tree = RedBlackBinaryTree.from_iterable(random.sample(range(n * 10), n))
+    keys = [random.randrange(n * 10) for _ in range(coroutines)]
+
+    async def per_await_executor():
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[loop.run_in_executor(None, tree.find, key) for key in keys])
+
+    async def per_await_inline():
+        async def lookup(key):
+            await asyncio.sleep(0)
+            return key in tree
+        await asyncio.gather(*[lookup(key) for key in keys])
+
+    async def batched():
+        async_tree = AsyncRedBlackTree(tree)
+        await asyncio.gather(*[async_tree.contains(key) for key in keys])
+
+    return {
+        'executor per await': coroutines / _timed(asyncio.run, per_await_executor()),
+        'inline per await': coroutines / _timed(asyncio.run, per_await_inline()),
+        'AsyncRedBlackTree': coroutines / _timed(asyncio.run, batched()),
+    }
+
+
+def set_algebra_benchmark(n=100000, m=1000):
+    """
+    split/join and set operations against re-inserting keys one at a time
+    :param n: number of keys in the big tree
+    :param m: number of keys in the small tree
+    :return: dictionary {method: seconds}
+    """
+    big = random.sample(range(n * 10), n)
+    small = random.sample(range(n * 10), m)
+    results = {}
+
+    tree = RedBlackBinaryTree.from_iterable(big)
+    results['union by insert'] = _timed(lambda: [tree.insert(key) for key in small])
+    tree, other = RedBlackBinaryTree.from_iterable(big), RedBlackBinaryTree.from_iterable(small)
+    results['union'] = _timed(tree.union, other)
+    tree, other = RedBlackBinaryTree.from_iterable(big), RedBlackBinaryTree.from_iterable(small)
+    results['difference'] = _timed(tree.difference, other)
+    tree = RedBlackBinaryTree.from_iterable(big)
+    pivot = sorted(big)[n // 2]
+    results['split by reinsert'] = _timed(lambda: (RedBlackBinaryTree.from_iterable(tree.irange(hi=pivot)),
+                                                   RedBlackBinaryTree.from_iterable(tree.irange(lo=pivot))))
+    results['split'] = _timed(tree.split, pivot)
+    return results
+
+
+def serialization_benchmark(n=100000, probes=10000):
+    """
+    dump/load and lookups on the memory-mapped file against rebuilding the tree
+    :param n: number of keys
+    :param probes: number of lookups
+    :return: dictionary {method: seconds}
+    """
+    keys = random.sample(range(n * 10), n)
+    probe_keys = random.sample(range(n * 10), probes)
+    path = os.path.join(tempfile.mkdtemp(), 'benchmark.rbt')
+    tree = RedBlackBinaryTree.from_iterable(keys)
+    results = {'from_iterable': _timed(RedBlackBinaryTree.from_iterable, keys),
+               'dump': _timed(tree.dump, path),
+               'load': _timed(RedBlackBinaryTree.load, path)}
+    results['mapped open'] = _timed(lambda: MappedRedBlackTree(path).close())
+    results['tree lookups'] = _timed(lambda: [tree.find(key) for key in probe_keys])
+    with MappedRedBlackTree(path) as mapped:
+        results['mapped lookups'] = _timed(lambda: [mapped.find(key) for key in probe_keys])
+    os.remove(path)
+    return results
+
+
+def sharded_benchmark(n=1000000, probes=1000000, shard_counts=None):
+    """
+    Batch throughput of the process-sharded tree against the shard count
+    :param n: number of keys inserted as one batch
+    :param probes: number of keys looked up as one batch
+    :param shard_counts: shard counts to try, powers of two up to the core count by default
+    :return: dictionary {method: keys per second}
+    """
+    if shard_counts is None:
+        cores = multiprocessing.cpu_count()
+        shard_counts = sorted({1 << i for i in range(cores.bit_length())} | {cores})
+    keys = random.sample(range(n * 10), n)
+    probe_keys = random.sample(range(n * 10), probes)
+    # Same two batches as the sharded trees, so that neither side times the bulk load of an empty tree
+    tree = RedBlackBinaryTree()
+    tree.insert_many(keys[:n // 2])
+    results = {'in-process insert_many': (n - n // 2) / _timed(tree.insert_many, keys[n // 2:]),
+               'in-process contains_many': probes / _timed(tree.contains_many, probe_keys)}
+    for shards in shard_counts:
+        with ShardedRedBlackTree(shards=shards) as sharded:
+            # The first batch lands in one shard and triggers the rebalance, time a second one
+            sharded.insert_many(keys[:n // 2])
+            results['{} shards insert_many'.format(shards)] = (n - n // 2) / _timed(sharded.insert_many,
+                                                                                   keys[n // 2:])
+            results['{} shards contains_many'.format(shards)] = probes / _timed(sharded.contains_many,
+                                                                               probe_keys)
+    return results
+
+
+def key_benchmark(n=100000):
+    """
+    Cost of the key function support: plain numbers on the fast path, the same numbers through
+    an identity key, and strings under an expensive key computed once per value against a
+    comparator that recomputes it on every comparison
+    :param n: number of keys
+    :return: dictionary {method: seconds for n inserts and n lookups}
+    """
+    keys = random.sample(range(n * 10), n)
+    words = [' {} '.format(key) for key in keys]
+
+    def normalize(word):
+        return word.strip().lower()
+
+    def compare(a, b):
+        a, b = normalize(a), normalize(b)
+        return (a > b) - (a < b)
+
+    def run(tree, values):
+        for value in values:
+            tree.insert(value)
+        for value in values:
+            tree.find(value)
+
+    return {'numbers, no key': _timed(run, RedBlackBinaryTree(), keys),
+            'numbers, identity key': _timed(run, RedBlackBinaryTree(key=lambda num: num), keys),
+            'strings, cached key': _timed(run, RedBlackBinaryTree(key=normalize), words),
+            'strings, comparator': _timed(run, RedBlackBinaryTree(key=functools.cmp_to_key(compare)), words)}
+
+
+def multiset_benchmark(n=100000, distinct=1000):
+    """
+    Duplicate-heavy workload, one node per insertion against one counted node per distinct key
+    :param n: number of insertions
+    :param distinct: number of distinct keys among them
+    :return: dictionary {measure: value}
+    """
+    keys = [random.randrange(distinct) for _ in range(n)]
+
+    def build(tree_class):
+        tree = tree_class()
+        for key in keys:
+            tree.insert(key)
+        return tree
+
+    return {'tree insert s': _timed(build, RedBlackBinaryTree),
+            'multiset insert s': _timed(build, RedBlackMultiset),
+            'tree bytes/insertion': _traced_bytes(lambda: build(RedBlackBinaryTree)) / n,
+            'multiset bytes/insertion': _traced_bytes(lambda: build(RedBlackMultiset)) / n}
+
+
+def interval_benchmark(n=100000, queries=100):
+    """
+    Overlap queries on the interval tree against a linear scan of the sorted intervals
+    :param n: number of intervals
+    :param queries: number of overlap queries
+    :return: dictionary {method: seconds}
+    """
+    starts = random.sample(range(n * 10), n)
+    tree = IntervalTree.from_iterable((start, start + random.randrange(100)) for start in starts)
+    points = [random.randrange(n * 10) for _ in range(queries)]
+
+    def scan():
+        intervals = tree.inorder_print_tree()
+        for point in points:
+            [interval for interval in intervals if interval[0] <= point + 50 and point <= interval[1]]
+
+    def query():
+        for point in points:
+            list(tree.overlap(point, point + 50))
+
+    return {'linear scan': _timed(scan), 'overlap': _timed(query)}
+
+
+def aggregate_benchmark(n=100000, queries=100):
+    """
+    Range sums from subtree summaries against summing the payloads of a range walk
+    :param n: number of keys
+    :param queries: number of range sums, each over about a tenth of the keys
+    :return: dictionary {method: seconds}
+    """
+    tree = AggregateTree('sum')
+    for key in random.sample(range(n * 10), n):
+        tree[key] = random.randrange(1000)
+    bounds = [(lo, lo + n) for lo in (random.randrange(n * 9) for _ in range(queries))]
+
+    def walk():
+        # Straight over the nodes, no lookup per key
+        for lo, hi in bounds:
+            sum(node.value for node in tree._irange_nodes(lo, hi, (True, True), False))
+
+    def aggregate():
+        for lo, hi in bounds:
+            tree.aggregate(lo, hi)
+
+    return {'irange walk': _timed(walk), 'aggregate': _timed(aggregate)}
+
+
+def stats_benchmark(n=100000, repeat=3, tolerance=0.1):
+    """
+    Cost of the operation stats: a tree that never enabled them, one that enabled and disabled
+    them again, which must run at the same speed, and one counting and timing every operation
+    :param n: number of keys
+    :param repeat: runs per measurement, the fastest one is kept
+    :param tolerance: largest accepted slowdown of the disabled tree, AssertionError past it
+    :return: dictionary {tree: seconds for n inserts, n lookups and n removals}
+    """
+    keys = random.sample(range(n * 10), n)
+
+    def run(tree):
+        for key in keys:
+            tree.insert(key)
+        for key in keys:
+            tree.find(key)
+        for key in keys:
+            tree.delete(tree.root, key)
+
+    def plain():
+        return RedBlackBinaryTree()
+
+    def disabled():
+        tree = RedBlackBinaryTree()
+        tree.enable_stats()
+        tree.disable_stats()
+        return tree
+
+    def enabled():
+        tree = RedBlackBinaryTree()
+        tree.enable_stats()
+        return tree
+
+    builders = (('never enabled', plain), ('disabled', disabled), ('enabled', enabled))
+    results = {name: float('inf') for name, build in builders}
+    # Interleaved runs, so that a slow stretch of the machine hits every tree alike
+    for _ in range(repeat):
+        for name, build in builders:
+            results[name] = min(results[name], _timed(run, build()))
+    if results['disabled'] > results['never enabled'] * (1 + tolerance):
+        raise AssertionError("Disabled stats run {:.0%} slower than never enabled ones".format(
+            results['disabled'] / results['never enabled'] - 1))
+    return results
+
+
+def cursor_benchmark(n=200000, spread=16, repeat=3):
+    """
+    Local access through a cursor against searches from the root, on sequential keys and on
+    keys within a few positions of the previous one
+    :param n: number of keys in the tree, and of lookups and insertions per workload
+    :param spread: largest jump of the near-sequential workload
+    :param repeat: runs per measurement, the fastest one is kept
+    :return: dictionary {workload: seconds}
+    """
+    tree = RedBlackBinaryTree.from_sorted(range(0, 2 * n, 2))
+    sequential = list(range(0, 2 * n, 2))
+    near = []
+    key = 0
+    for _ in range(n):
+        key = max(0, key + random.randint(-spread // 4, spread)) % (2 * n)
+        near.append(key)
+
+    def find_all(keys):
+        for key in keys:
+            tree.find(key)
+
+    def seek_all(keys):
+        cursor = tree.cursor()
+        for key in keys:
+            cursor.seek(key)
+
+    def insert_all(fresh, keys):
+        for key in keys:
+            fresh.insert(key + 1)
+
+    def insert_here_all(fresh, keys):
+        cursor = fresh.cursor()
+        for key in keys:
+            cursor.insert_here(key + 1)
+
+    def fresh():
+        return RedBlackBinaryTree.from_sorted(range(0, 2 * n, 2))
+
+    results = {}
+    for name, keys in (('sequential', sequential), ('near-sequential', near)):
+        results[name + ' find'] = min(_timed(find_all, keys) for _ in range(repeat))
+        results[name + ' seek'] = min(_timed(seek_all, keys) for _ in range(repeat))
+        results[name + ' insert'] = min(_timed(insert_all, fresh(), keys) for _ in range(repeat))
+        results[name + ' insert_here'] = min(_timed(insert_here_all, fresh(), keys) for _ in range(repeat))
+    return results
+
+
+def bounded_benchmark(n=200000, max_size=10000):
+    """
+    Ordered cache keeping the largest max_size keys of a stream: trimming by hand with
+    delete(root, num) on the smallest values against BoundedRedBlackTree evicting the cached minimum,
+    and the same stream under the LRU policy
+    :param n: number of insertions
+    :param max_size: bound of the cache
+    :return: dictionary {method: seconds}
+    """
+    keys = [random.random() for _ in range(n)]
+
+    def trimmed():
+        tree = RedBlackBinaryTree()
+        for key in keys:
+            tree.insert(key)
+            if len(tree) > max_size:
+                tree.delete(tree.root, next(iter(tree)))
+
+    def bounded(policy):
+        tree = BoundedRedBlackTree(max_size, policy)
+        for key in keys:
+            tree.insert(key)
+
+    return {'insert + delete smallest': _timed(trimmed),
+            'bounded, evict min': _timed(bounded, 'min'),
+            'bounded, evict lru': _timed(bounded, 'lru')}
+
+
+class _HeapQueue:
+    """
+    heapq with lazy cancellation, the usual recipe: cancelled and reprioritized entries stay in
+    the heap marked dead until they reach the top
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._count = itertools.count()
+
+    def push(self, priority, item=None):
+        entry = [priority, next(self._count), item, True]
+        heapq.heappush(self._heap, entry)
+        return entry
+
+    def cancel(self, entry):
+        entry[3] = False
+
+    def update_priority(self, entry, priority):
+        entry[3] = False
+        return self.push(priority, entry[2])
+
+    def pop_min(self):
+        while True:
+            priority, _, item, alive = heapq.heappop(self._heap)
+            if alive:
+                return priority, item
+
+
+def priority_queue_benchmark(n=20000, ops=200000, cancel_share=0.4, update_share=0.4):
+    """
+    Timer queue churn where most operations cancel or reprioritize entries: TreePriorityQueue
+    against heapq with lazy cancellation, whose heap keeps growing with dead entries
+    Each cancellation is followed by a push, so n entries stay live throughout
+    :param n: number of live entries
+    :param ops: number of operations after the initial pushes
+    :param cancel_share: share of the operations cancelling an entry
+    :param update_share: share of the operations changing a priority
+    :return: dictionary {measure: value}
+    """
+    plan = []
+    for _ in range(ops):
+        roll = random.random()
+        if roll < cancel_share:
+            plan.append(('cancel', random.randrange(n), random.random()))
+        elif roll < cancel_share + update_share:
+            plan.append(('update', random.randrange(n), random.random()))
+        else:
+            plan.append(('pop', random.randrange(n), random.random()))
+
+    def run(queue):
+        handles = [queue.push(random.random(), i) for i in range(n)]
+        for op, i, priority in plan:
+            if op == 'cancel':
+                queue.cancel(handles[i])
+                handles[i] = queue.push(priority, i)
+            elif op == 'update':
+                # heapq hands back a new entry, the tree keeps the handle
+                handles[i] = queue.update_priority(handles[i], priority) or handles[i]
+            else:
+                _, item = queue.pop_min()
+                handles[item] = queue.push(priority, item)
+        return queue
+
+    heap_queue = _HeapQueue()
+    tree_seconds = _timed(run, TreePriorityQueue())
+    heap_seconds = _timed(run, heap_queue)
+    return {'TreePriorityQueue ops/s': ops / tree_seconds,
+            'heapq ops/s': ops / heap_seconds,
+            'heapq entries left for n live': len(heap_queue._heap) / n}
+
+
+# Reference suite: structures compared on the same keys, see suite_benchmark
+SUITE_DISTRIBUTIONS = ('random', 'sorted', 'reversed', 'duplicates')
+# Largest size each quadratic structure is run at
+_SUITE_LIMITS = {'bisect list': 100000}
+
+
+def _suite_keys(distribution, n, rng):
+    """
+    Keys of a suite run
+    :param distribution: one of SUITE_DISTRIBUTIONS
+    :param n: number of keys
+    :param rng: random.Random
+    :return: list of keys
+    """
+    if distribution == 'random':
+        return rng.sample(range(n * 10), n)
+    if distribution == 'sorted':
+        return list(range(n))
+    if distribution == 'reversed':
+        return list(range(n, 0, -1))
+    if distribution == 'duplicates':
+        # About a hundred copies of each key
+        return [rng.randrange(max(1, n // 100)) for _ in range(n)]
+    raise ValueError("Unknown distribution {}".format(distribution))
+
+
+def _find_all(tree, keys):
+    for key in keys:
+        tree.find(key)
+
+
+def _list_insert_all(keys):
+    values = []
+    for key in keys:
+        bisect.insort(values, key)
+    return values
+
+
+def _list_find_all(values, keys):
+    for key in keys:
+        i = bisect.bisect_left(values, key)
+        i < len(values) and values[i] == key
+
+
+def _list_delete_all(values, keys):
+    for key in keys:
+        del values[bisect.bisect_left(values, key)]
+
+
+def _set_insert_all(keys):
+    values = set()
+    for key in keys:
+        values.add(key)
+    return values
+
+
+def _set_find_all(values, keys):
+    for key in keys:
+        key in values
+
+
+def _set_delete_all(values, keys):
+    for key in keys:
+        values.discard(key)
+
+
+def _sorted_list_insert_all(keys):
+    values = sortedcontainers.SortedList()
+    for key in keys:
+        values.add(key)
+    return values
+
+
+def _suite_structures():
+    """
+    Structures of the suite with their (build, find, delete, iterate) functions
+    set has no order, so iterating it means sorting, and it keeps one copy of duplicates
+    :return: dictionary {name: functions}
+    """
+    structures = {
+        'RedBlackBinaryTree': (_insert_all, _find_all, _delete_all, list),
+        'bisect list': (_list_insert_all, _list_find_all, _list_delete_all, list),
+        'set': (_set_insert_all, _set_find_all, _set_delete_all, sorted),
+    }
+    if sortedcontainers is not None:
+        structures['SortedList'] = (_sorted_list_insert_all, _set_find_all, _set_delete_all, list)
+    return structures
+
+
+def suite_benchmark(sizes=(1000, 10000, 100000), distributions=SUITE_DISTRIBUTIONS, repeat=3, seed=0):
+    """
+    Insert, find, iterate and delete on the tree and on reference structures, best of repeat runs
+    Keys come from a seeded generator, so two runs with the same arguments time the same work
+    :param sizes: numbers of keys, up to 1e7
+    :param distributions: key distributions from SUITE_DISTRIBUTIONS
+    :param repeat: runs per measurement, the fastest one is kept
+    :param seed: seed of the key generator
+    :return: dictionary {"structure/distribution/size/operation": nanoseconds per key}
+    """
+    rng = random.Random(seed)
+    structures = _suite_structures()
+    results = {}
+    for size in sizes:
+        n = int(size)
+        for distribution in distributions:
+            keys = _suite_keys(distribution, n, rng)
+            probes = list(keys)
+            rng.shuffle(probes)
+            for name, (build, find, delete, iterate) in structures.items():
+                if n > _SUITE_LIMITS.get(name, n):
+                    continue
+                best = collections.defaultdict(lambda: float('inf'))
+                for _ in range(repeat):
+                    built = []
+                    best['insert'] = min(best['insert'], _timed(lambda: built.append(build(keys))))
+                    structure = built[0]
+                    best['find'] = min(best['find'], _timed(find, structure, probes))
+                    best['iterate'] = min(best['iterate'], _timed(iterate, structure))
+                    if name == 'RedBlackBinaryTree':
+                        best['graphicalPrintTree'] = min(best['graphicalPrintTree'],
+                                                         _timed(structure.graphicalPrintTree))
+                    best['delete'] = min(best['delete'], _timed(delete, structure, probes))
+                for operation, seconds in best.items():
+                    results['/'.join((name, distribution, str(n), operation))] = seconds * 1e9 / n
+    return results
+
+
+def check_regressions(results, baseline, tolerance=0.25, structure='RedBlackBinaryTree'):
+    """
+    Compare suite results against a baseline from an earlier run, reference structures are skipped
+    :param results: dictionary from suite_benchmark
+    :param baseline: dictionary from suite_benchmark, for instance loaded back from its JSON output
+    :param tolerance: allowed slowdown, 0.25 lets a measurement be 25% slower
+    :param structure: structure whose measurements are checked
+    :return: dictionary {measurement: new / old} of the regressions
+    """
+    regressions = {}
+    for name, value in results.items():
+        if not name.startswith(structure + '/') or name not in baseline:
+            continue
+        ratio = value / baseline[name]
+        if ratio > 1 + tolerance:
+            regressions[name] = ratio
+    return regressions
+
+
+def _print_results(title, results, unit):
+    print("\n{}: ".format(title))
+    for name, value in results.items():
+        print("{0:<28} {1:.4f} {2}".format(name, value, unit))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks of the red black tree and its variants")
+    parser.add_argument('--suite', action='store_true',
+                        help="run the reference suite against bisect/set/sortedcontainers instead")
+    parser.add_argument('--sizes', type=float, nargs='+', default=[1e3, 1e4, 1e5],
+                        help="suite sizes, from 1e3 up to 1e7")
+    parser.add_argument('--distributions', nargs='+', choices=SUITE_DISTRIBUTIONS, default=SUITE_DISTRIBUTIONS)
+    parser.add_argument('--repeat', type=int, default=3, help="runs per suite measurement, best one is kept")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', metavar='PATH', help="write the suite results to PATH")
+    parser.add_argument('--check', metavar='BASELINE',
+                        help="compare the suite against the JSON of an earlier run, exit 1 on regressions")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed slowdown for --check")
+    args = parser.parse_args(argv)
+
+    if args.suite or args.check:
+        results = suite_benchmark(args.sizes, args.distributions, args.repeat, args.seed)
+        _print_results("Suite", results, "ns/key")
+        if args.json:
+            with open(args.json, 'w') as handle:
+                json.dump({'python': platform.python_version(), 'machine': platform.machine(),
+                           'seed': args.seed, 'results': results}, handle, indent=2, sort_keys=True)
+        if args.check:
+            with open(args.check) as handle:
+                baseline = json.load(handle)['results']
+            regressions = check_regressions(results, baseline, args.tolerance)
+            _print_results("Regressions", regressions, "x baseline")
+            if regressions:
+                sys.exit(1)
+        return
+
+    _print_results("Memory", memory_benchmark(), "bytes/key")
+    _print_results("Bulk load", bulk_load_benchmark(), "s")
+    _print_results("Batch", batch_benchmark(), "keys/s")
+    _print_results("Order statistics", order_statistic_benchmark(), "s")
+    _print_results("Lookup", lookup_benchmark(), "keys/s")
+    _print_results("Concurrency", concurrency_benchmark(), "ops/s")
+    _print_results("Persistent", persistent_benchmark(), "us/version")
+    _print_results("Async", async_benchmark(), "lookups/s")
+    _print_results("Set algebra", set_algebra_benchmark(), "s")
+    _print_results("Serialization", serialization_benchmark(), "s")
+    _print_results("Sharded", sharded_benchmark(), "keys/s")
+    _print_results("Key functions", key_benchmark(), "s")
+    _print_results("Multiset", multiset_benchmark(), "")
+    _print_results("Intervals", interval_benchmark(), "s")
+    _print_results("Aggregates", aggregate_benchmark(), "s")
+    _print_results("Stats", stats_benchmark(), "s")
+    _print_results("Cursor", cursor_benchmark(), "s")
+    _print_results("Bounded", bounded_benchmark(), "s")
+    _print_results("Priority queue", priority_queue_benchmark(), "")
+
+
+if __name__ == '__main__':
+    main()
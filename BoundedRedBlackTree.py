@@ -0,0 +1,319 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+@author: Michael Lin
+"""
+from RedBlackBinaryTree.RedBlackBinaryTree import Node, RedBlackBinaryTree, _refused
+
+EVICTION_POLICIES = ('min', 'max', 'lru')
+
+
+class AccessNode(Node):
+    __slots__ = ('newer', 'older')
+
+    def __init__(self, val):
+        super(AccessNode, self).__init__(val)
+        # Neighbours in the access list of the tree, None while the node is not in it
+        self.newer = None
+        self.older = None
+
+
+class BoundedRedBlackTree(RedBlackBinaryTree):
+    """
+    Red black tree holding at most max_size values, the ordered cache case
+    Insertions past the bound evict the smallest value ('min'), the largest one ('max') or the
+    least recently accessed one ('lru'), each eviction reported to on_evict(value, payload)
+    The leftmost and rightmost nodes are cached, so pop_min, pop_max and min/max evictions
+    take amortized O(1). Under 'lru' the nodes are also threaded on an intrusive doubly linked
+    list, refreshed by insertions and by lookups through find, in, get, [] and setdefault
+    """
+    # Rebuilds drop nodes without _delete_node, which the access list and cached extremes rely on,
+    # so batches only take the rebuild path on an empty tree
+    _REBUILD_RATIO = 0
+
+    def __init__(self, max_size=None, policy='min', on_evict=None, key=None):
+        if policy not in EVICTION_POLICIES:
+            raise ValueError("Unknown eviction policy {}".format(policy))
+        if max_size is not None and max_size < 0:
+            raise ValueError("max_size must not be negative")
+        # Only the access list needs the two extra slots
+        self._node_class = AccessNode if policy == 'lru' else Node
+        super(BoundedRedBlackTree, self).__init__(key)
+        self.max_size = max_size
+        self.policy = policy
+        self.on_evict = on_evict
+        self._min_node = None
+        self._max_node = None
+        # Circular access list around a sentinel, newest after it and oldest before it
+        self._access = AccessNode(None)
+        self._access.newer = self._access.older = self._access
+
+    @classmethod
+    def from_sorted(cls, iterable, key=None, max_size=None, policy='min', on_evict=None):
+        """
+        Load sorted values, each appended next to the largest one and trimmed right away
+        :param iterable: values in non-decreasing order of their sort keys
+        :param key: key function of the new tree
+        :param max_size: bound of the new tree, see __init__
+        :param policy: eviction policy of the new tree
+        :param on_evict: eviction callback of the new tree
+        :return: BoundedRedBlackTree
+        """
+        tree = cls(max_size, policy, on_evict, key)
+        last = None
+        for i, num in enumerate(iterable):
+            node = tree._new_leaf(num)
+            if last is not None and node.key < last.key:
+                raise ValueError("Input is not sorted at position {}".format(i))
+            last = tree._insert_node(node, tree._max_node)
+            tree._trim()
+        return tree
+
+    @classmethod
+    def from_iterable(cls, iterable, key=None, max_size=None, policy='min', on_evict=None):
+        tree = cls(max_size, policy, on_evict, key)
+        tree.insert_many(iterable)
+        return tree
+
+    def __setitem__(self, key, value):
+        super(BoundedRedBlackTree, self).__setitem__(key, value)
+        self._trim()
+
+    def setdefault(self, key, default=None):
+        value = super(BoundedRedBlackTree, self).setdefault(key, default)
+        self._trim()
+        return value
+
+    def insert(self, num):
+        super(BoundedRedBlackTree, self).insert(num)
+        self._trim()
+
+    def insert_many(self, keys):
+        if self.max_size is None:
+            super(BoundedRedBlackTree, self).insert_many(keys)
+            return
+        # Trimmed value by value, so that a large batch never holds more than max_size + 1 values
+        for num in keys:
+            self._insert_node(self._new_leaf(num))
+            self._trim()
+
+    def find(self, num):
+        return self._find_key(self._sort_key(num)) is not None
+
+    @property
+    def _reads_mutate(self):
+        # Lookups move nodes in the access list
+        return self.policy == 'lru' or super(BoundedRedBlackTree, self)._reads_mutate
+
+    def min(self):
+        """
+        Smallest value
+        :return: value, IndexError if the tree is empty
+        """
+        if self._min_node is None:
+            raise IndexError("min of an empty tree")
+        return self._min_node.val
+
+    def max(self):
+        """
+        Largest value
+        :return: value, IndexError if the tree is empty
+        """
+        if self._max_node is None:
+            raise IndexError("max of an empty tree")
+        return self._max_node.val
+
+    def pop_min(self):
+        """
+        Remove the smallest value, amortized O(1) from the cached leftmost node
+        :return: value, IndexError if the tree is empty
+        """
+        if self._min_node is None:
+            raise IndexError("pop from an empty tree")
+        node = self._min_node
+        self._delete_node(node)
+        return node.val
+
+    def pop_max(self):
+        """
+        Remove the largest value, amortized O(1) from the cached rightmost node
+        :return: value, IndexError if the tree is empty
+        """
+        if self._max_node is None:
+            raise IndexError("pop from an empty tree")
+        node = self._max_node
+        self._delete_node(node)
+        return node.val
+
+    @classmethod
+    def join(cls, left, num, right):
+        """
+        Concatenate two trees of the same policy around num, see RedBlackBinaryTree.join
+        The result takes the bound of left and is trimmed to it. Under 'lru' the values of left count as
+        older than those of right and num as the newest, rebuilding the access list takes O(n)
+        :param left: BoundedRedBlackTree
+        :param num: number placed between them
+        :param right: BoundedRedBlackTree
+        :return: new tree
+        """
+        if left.policy != right.policy:
+            raise ValueError("Trees with different eviction policies cannot be joined")
+        order = list(left._access_order()) + list(right._access_order())
+        left_max = left._max_node
+        tree = super(BoundedRedBlackTree, cls).join(left, num, right)
+        tree._min_node = tree._minVal(tree.root)
+        tree._max_node = tree._maxVal(tree.root)
+        if tree.policy == 'lru':
+            # The node of num comes right after every node of left
+            order.append(tree._min_node if left_max is None else tree._successor(left_max))
+            tree._rethread(order)
+        tree._trim()
+        return tree
+
+    def split(self, num):
+        """
+        Cut the tree at num, see RedBlackBinaryTree.split, both sides keep the bound and the policy
+        Under 'lru' each side keeps the access order of its values, rebuilding the lists takes O(n)
+        :param num: number
+        :return: (tree of values < num, tree of values >= num)
+        """
+        order = list(self._access_order())
+        key = self._sort_key(num)
+        left, right = super(BoundedRedBlackTree, self).split(num)
+        for side in (left, right):
+            if side.root is not side.null_node:
+                side._min_node = side._minVal(side.root)
+                side._max_node = side._maxVal(side.root)
+        if self.policy == 'lru':
+            left._rethread(node for node in order if node.key < key)
+            right._rethread(node for node in order if not node.key < key)
+        return left, right
+
+    # The dump format has no room for the access order, and cursor insertions and set operations
+    # relink nodes past the bound and the cached extremes
+    cursor = dump = load = _merge_operation = _set_operation = _refused(
+        "BoundedRedBlackTree does not support cursor, dump, load or set operations")
+
+    def _trim(self):
+        """
+        Evict values until the tree is back within max_size
+        :return: None
+        """
+        if self.max_size is None:
+            return
+        while self._size > self.max_size:
+            if self.policy == 'min':
+                node = self._min_node
+            elif self.policy == 'max':
+                node = self._max_node
+            else:
+                node = self._access.older
+            self._delete_node(node)
+            if self.on_evict is not None:
+                self.on_evict(node.val, node.value)
+
+    def _access_order(self):
+        """
+        Walk the access list
+        :return: generator of nodes from the oldest access to the newest, nothing unless the policy is 'lru'
+        """
+        head = self._access
+        node = head.older
+        while node is not head:
+            yield node
+            node = node.older
+
+    def _rethread(self, nodes):
+        """
+        Rebuild the access list from scratch
+        :param nodes: iterable of nodes from the oldest access to the newest
+        :return: None
+        """
+        head = self._access
+        head.newer = head.older = head
+        for node in nodes:
+            node.newer = node.older = None
+            self._touch(node)
+
+    def _touch(self, node):
+        """
+        Move a node to the newest end of the access list
+        :param node: node of the tree, already in the list or not yet
+        :return: None
+        """
+        head = self._access
+        if node.newer is not None:
+            node.newer.older = node.older
+            node.older.newer = node.newer
+        node.older = head
+        node.newer = head.newer
+        head.newer.older = node
+        head.newer = node
+
+    def _spawn(self, null_node):
+        tree = type(self)(self.max_size, self.policy, self.on_evict, self.key)
+        tree.null_node = null_node
+        tree.root = null_node
+        return tree
+
+    def _clear(self):
+        super(BoundedRedBlackTree, self)._clear()
+        self._min_node = self._max_node = None
+        self._access = AccessNode(None)
+        self._access.newer = self._access.older = self._access
+
+    def _find_key(self, key):
+        node = super(BoundedRedBlackTree, self)._find_key(key)
+        if node is not None and self.policy == 'lru':
+            self._touch(node)
+        return node
+
+    def _link(self, node, parent):
+        super(BoundedRedBlackTree, self)._link(node, parent)
+        # Equal keys go right, so only a strictly smaller key becomes the new minimum
+        if parent is None:
+            self._min_node = self._max_node = node
+        elif parent is self._min_node and parent.left is node:
+            self._min_node = node
+        elif parent is self._max_node and parent.right is node:
+            self._max_node = node
+        if self.policy == 'lru':
+            self._touch(node)
+
+    def _delete_node(self, curr):
+        # Both neighbours keep their nodes through the removal
+        if curr is self._min_node:
+            self._min_node = self._successor(curr)
+        if curr is self._max_node:
+            self._max_node = self._predecessor(curr)
+        if self.policy == 'lru':
+            curr.newer.older = curr.older
+            curr.older.newer = curr.newer
+            curr.newer = curr.older = None
+        super(BoundedRedBlackTree, self)._delete_node(curr)
+
+    def _relink(self, nodes):
+        # Only reached with an empty tree, see _REBUILD_RATIO
+        root = super(BoundedRedBlackTree, self)._relink(nodes)
+        self._min_node = nodes[0] if nodes else None
+        self._max_node = nodes[-1] if nodes else None
+        if self.policy == 'lru':
+            for node in nodes:
+                self._touch(node)
+        return root
+
+
+def main():
+    bd_test_tree = BoundedRedBlackTree(3, 'lru', on_evict=lambda num, value: print("Evicted {}".format(num)))
+    for num in [55, 40, 30]:
+        bd_test_tree.insert(num)
+    print(55 in bd_test_tree)
+    bd_test_tree.insert(35)
+    bd_test_tree.insert(70)
+    print(list(bd_test_tree))
+    print("Pop min {}, pop max {}".format(bd_test_tree.pop_min(), bd_test_tree.pop_max()))
+
+
+if __name__ == '__main__':
+    main()
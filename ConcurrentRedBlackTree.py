@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+@author: Michael Lin
+"""
+import contextlib
+import threading
+
+from RedBlackBinaryTree.PersistentRedBlackTree import PersistentRedBlackTree
+from RedBlackBinaryTree.RedBlackBinaryTree import RedBlackBinaryTree
+
+
+class ReadWriteLock:
+    """
+    Many readers or a single writer at a time
+    Waiting writers block new readers so that a steady stream of reads cannot starve them
+    """
+    def __init__(self):
+        super(ReadWriteLock, self).__init__()
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    def acquire_read(self):
+        with self._cond:
+            while self._writer or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._cond:
+            self._readers -= 1
+            if not self._readers:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        with self._cond:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+
+    def release_write(self):
+        with self._cond:
+            self._writer = False
+            self._cond.notify_all()
+
+    @contextlib.contextmanager
+    def read_locked(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextlib.contextmanager
+    def write_locked(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class ConcurrentRedBlackTree:
+    """
+    Thread-safe front of a RedBlackBinaryTree (or any subclass of it)
+    Lookups share a read lock, mutations serialize on the write lock, and so do lookups on trees
+    whose reads change state, like an 'lru' BoundedRedBlackTree or a tree counting stats
+    Iterators see one consistent version and never hold the lock while the caller consumes them:
+    a PersistentRedBlackTree is frozen by an O(1) snapshot and iterated lazily, any other tree
+    has the requested values copied under the read lock
+    """
+    def __init__(self, tree=None):
+        super(ConcurrentRedBlackTree, self).__init__()
+        self._tree = RedBlackBinaryTree() if tree is None else tree
+        self._lock = ReadWriteLock()
+        self._persistent = isinstance(self._tree, PersistentRedBlackTree)
+
+    def _reading(self):
+        """
+        Lock for a lookup
+        :return: context manager, the write lock if lookups change the tree
+        """
+        if self._tree._reads_mutate:
+            return self._lock.write_locked()
+        return self._lock.read_locked()
+
+    def _iterate(self, method, *args):
+        """
+        Iterator of the tree over one consistent version
+        :param method: name of the iterator method of the tree
+        :param args: arguments of the method
+        :return: iterator, lazy over a snapshot for a persistent tree, over a copy otherwise
+        """
+        with self._reading():
+            if not self._persistent:
+                return iter(list(getattr(self._tree, method)(*args)))
+            frozen = self._tree.snapshot()
+        return getattr(frozen, method)(*args)
+
+    # Reads
+    def __contains__(self, key):
+        return self.find(key)
+
+    def __len__(self):
+        with self._reading():
+            return len(self._tree)
+
+    def __getitem__(self, key):
+        with self._reading():
+            return self._tree[key]
+
+    def find(self, num):
+        with self._reading():
+            return self._tree.find(num)
+
+    def contains_many(self, keys):
+        with self._reading():
+            return self._tree.contains_many(keys)
+
+    def get(self, key, default=None):
+        with self._reading():
+            return self._tree.get(key, default)
+
+    def floor(self, num):
+        with self._reading():
+            return self._tree.floor(num)
+
+    def ceiling(self, num):
+        with self._reading():
+            return self._tree.ceiling(num)
+
+    def predecessor(self, num):
+        with self._reading():
+            return self._tree.predecessor(num)
+
+    def successor(self, num):
+        with self._reading():
+            return self._tree.successor(num)
+
+    def inorder_print_tree(self):
+        with self._reading():
+            return self._tree.inorder_print_tree()
+
+    def preorder_print_tree(self):
+        with self._reading():
+            return self._tree.preorder_print_tree()
+
+    def postorder_print_tree(self):
+        with self._reading():
+            return self._tree.postorder_print_tree()
+
+    def graphicalPrintTree(self):
+        with self._reading():
+            return self._tree.graphicalPrintTree()
+
+    # Iterators, each one runs over a consistent version
+    def snapshot(self):
+        """
+        Consistent copy of the values
+        :return: list of values in ascending order
+        """
+        return list(self._iterate('__iter__'))
+
+    def __iter__(self):
+        return self._iterate('__iter__')
+
+    def __reversed__(self):
+        return self._iterate('__reversed__')
+
+    def irange(self, lo=None, hi=None, inclusive=(True, True), reverse=False):
+        return self._iterate('irange', lo, hi, inclusive, reverse)
+
+    def islice(self, start=None, stop=None, reverse=False):
+        return self._iterate('islice', start, stop, reverse)
+
+    def keys(self):
+        return self._iterate('keys')
+
+    def values(self):
+        return self._iterate('values')
+
+    def items(self):
+        return self._iterate('items')
+
+    # Writes
+    def __setitem__(self, key, value):
+        with self._lock.write_locked():
+            self._tree[key] = value
+
+    def __delitem__(self, key):
+        with self._lock.write_locked():
+            del self._tree[key]
+
+    def insert(self, num):
+        with self._lock.write_locked():
+            self._tree.insert(num)
+
+    def insert_many(self, keys):
+        with self._lock.write_locked():
+            self._tree.insert_many(keys)
+
+    def delete(self, num):
+        """
+        Removal, the search always starts from the root of the wrapped tree
+        :param num: number to be removed
+        :return: None
+        """
+        with self._lock.write_locked():
+            self._tree.delete(self._tree.root, num)
+
+    def delete_many(self, keys):
+        with self._lock.write_locked():
+            return self._tree.delete_many(keys)
+
+    def pop(self, key, *default):
+        with self._lock.write_locked():
+            return self._tree.pop(key, *default)
+
+    def setdefault(self, key, default=None):
+        with self._lock.write_locked():
+            return self._tree.setdefault(key, default)
+
+
+def main():
+    cc_test_tree = ConcurrentRedBlackTree()
+    workers = [threading.Thread(target=cc_test_tree.insert_many, args=(range(i, 1000, 4),)) for i in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    print(len(cc_test_tree), 999 in cc_test_tree)
+    print(list(cc_test_tree.irange(10, 20)))
+
+
+if __name__ == '__main__':
+    main()
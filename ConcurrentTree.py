@@ -14,7 +14,7 @@ import rx
 from rx.scheduler import ThreadPoolScheduler
 from rx import operators as ops
 
-from RedBlackBinaryTree.RedBlackBinaryTree import RedBlackBinaryTree
+from RedBlackBinaryTree.ConcurrentRedBlackTree import ConcurrentRedBlackTree
 
 
 def pause_thread(value):
@@ -40,7 +40,8 @@ pool_scheduler = ThreadPoolScheduler(optimal_thread_count)
 
 def main():
     # Trying out multiprocessing in python using reactive programming
-    rb_test_tree = RedBlackBinaryTree()
+    # The tree is shared by the scheduler threads, so it goes behind the readers-writer lock
+    rb_test_tree = ConcurrentRedBlackTree()
     rb_test_tree.insert(55)
     rb_test_tree.insert(40)
     rb_test_tree.insert(30)
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+@author: Michael Lin
+"""
+import argparse
+import bisect
+import random
+import time
+
+from RedBlackBinaryTree.AggregateTree import AggregateTree
+from RedBlackBinaryTree.OrderStatisticTree import OrderStatisticTree
+from RedBlackBinaryTree.PersistentRedBlackTree import PersistentRedBlackTree
+from RedBlackBinaryTree.RedBlackBinaryTree import RedBlackBinaryTree
+from RedBlackBinaryTree.RedBlackMultiset import RedBlackMultiset
+
+# Tree classes the harness can drive, all of them keep duplicates like the sorted list model
+FUZZ_TREES = {cls.__name__: cls for cls in (RedBlackBinaryTree, OrderStatisticTree, PersistentRedBlackTree,
+                                            AggregateTree, RedBlackMultiset)}
+
+
+def _floor(model, key):
+    i = bisect.bisect_right(model, key)
+    return model[i - 1] if i else None
+
+
+def _ceiling(model, key):
+    i = bisect.bisect_left(model, key)
+    return model[i] if i < len(model) else None
+
+
+def _predecessor(model, key):
+    i = bisect.bisect_left(model, key)
+    return model[i - 1] if i else None
+
+
+def _successor(model, key):
+    i = bisect.bisect_right(model, key)
+    return model[i] if i < len(model) else None
+
+
+def _batch_size(rng, n):
+    # Mostly small batches applied key by key, now and then one large enough to merge and rebuild
+    if rng.random() < 0.1:
+        return rng.randrange(1, n + 2)
+    return rng.randrange(1, 33)
+
+
+def fuzz(tree_class=RedBlackBinaryTree, ops=1000000, key_range=1000, seed=0, validate_every=10000):
+    """
+    Differential fuzzing: random mixed operations applied to a tree and to a sorted list model,
+    every answer compared, a sampled validate() after each change and a full one every so often
+    Insertions and removals balance out around key_range values, a small key range keeps
+    duplicates, absent keys and emptied trees frequent
+    :param tree_class: class from FUZZ_TREES
+    :param ops: number of operations
+    :param key_range: keys are drawn from range(key_range)
+    :param seed: seed of the operation generator, a failure is replayed by running the same seed again
+    :param validate_every: operations between two full validate() calls
+    :return: operations per second
+    """
+    rng = random.Random(seed)
+    tree = tree_class()
+    model = []
+    queries = (('find', lambda key: model[bisect.bisect_left(model, key):bisect.bisect_right(model, key)] != []),
+               ('floor', lambda key: _floor(model, key)),
+               ('ceiling', lambda key: _ceiling(model, key)),
+               ('predecessor', lambda key: _predecessor(model, key)),
+               ('successor', lambda key: _successor(model, key)))
+
+    def check(i, op, got, expected):
+        if got != expected:
+            raise AssertionError("Operation {} ({}) with seed {}: got {}, expected {}".format(i, op, seed, got,
+                                                                                            expected))
+
+    start = time.perf_counter()
+    for i in range(ops):
+        roll = rng.random()
+        key = rng.randrange(key_range)
+        # Changes lean towards removal once the tree holds more than key_range values
+        grow = rng.randrange(2 * key_range) >= len(model)
+        if roll < 0.55 and grow:
+            op = 'insert {}'.format(key)
+            tree.insert(key)
+            bisect.insort(model, key)
+        elif roll < 0.55:
+            op = 'delete {}'.format(key)
+            j = bisect.bisect_left(model, key)
+            if j < len(model) and model[j] == key:
+                tree.delete(tree.root, key)
+                del model[j]
+            else:
+                # delete() prints for absent keys, go through the batch version
+                check(i, op, tree.delete_many([key]), 0)
+        elif roll < 0.9:
+            name, answer = queries[rng.randrange(len(queries))]
+            op = '{} {}'.format(name, key)
+            check(i, op, getattr(tree, name)(key), answer(key))
+            continue
+        elif roll < 0.97 and grow:
+            batch = [rng.randrange(key_range) for _ in range(_batch_size(rng, len(model)))]
+            op = 'insert_many of {}'.format(len(batch))
+            tree.insert_many(batch)
+            model.extend(batch)
+            model.sort()
+        elif roll < 0.99:
+            batch = [rng.randrange(key_range) for _ in range(_batch_size(rng, len(model)))]
+            op = 'delete_many of {}'.format(len(batch))
+            removed = 0
+            for num in batch:
+                j = bisect.bisect_left(model, num)
+                if j < len(model) and model[j] == num:
+                    del model[j]
+                    removed += 1
+            check(i, op, tree.delete_many(batch), removed)
+        else:
+            lo = key
+            hi = lo + rng.randrange(key_range // 10 + 1)
+            op = 'irange {} {}'.format(lo, hi)
+            check(i, op, list(tree.irange(lo, hi)), model[bisect.bisect_left(model, lo):bisect.bisect_right(model, hi)])
+            continue
+
+        check(i, op, len(tree), len(model))
+        try:
+            tree.validate(None if i % validate_every == 0 else 1)
+        except ValueError as e:
+            raise AssertionError("Operation {} ({}) with seed {}: {}".format(i, op, seed, e))
+
+    tree.validate()
+    check(ops, 'final', list(tree), model)
+    return ops / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Differential fuzzing of the trees against a sorted list")
+    parser.add_argument('--tree', choices=sorted(FUZZ_TREES), nargs='+', default=sorted(FUZZ_TREES))
+    parser.add_argument('--ops', type=float, default=1e6, help="operations per tree")
+    parser.add_argument('--keys', type=int, default=1000, help="size of the key range")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--validate-every', type=int, default=10000, help="operations between full checks")
+    args = parser.parse_args(argv)
+
+    for name in args.tree:
+        rate = fuzz(FUZZ_TREES[name], int(args.ops), args.keys, args.seed, args.validate_every)
+        print("{:<28} {} ops passed, {:.0f} ops/s".format(name, int(args.ops), rate))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+@author: Michael Lin
+"""
+from RedBlackBinaryTree.RedBlackBinaryTree import AugmentedRedBlackTree, Node
+
+
+class IntervalNode(Node):
+    __slots__ = ('max_end',)
+
+    def __init__(self, val):
+        super(IntervalNode, self).__init__(val)
+        # Largest interval end in the subtree rooted here, None below the leaves
+        self.max_end = None if val is None else val[1]
+
+
+class IntervalTree(AugmentedRedBlackTree):
+    """
+    Red black tree of closed intervals (lo, hi) ordered by their start, augmented with the
+    largest end of each subtree so that subtrees ending before a query are skipped whole
+    Intervals go through the usual API: insert((lo, hi)), delete_many, tree[(lo, hi)] = payload
+    """
+    _node_class = IntervalNode
+
+    def overlap(self, lo, hi):
+        """
+        Lazy overlap query in O(min(n, k log n)) for k results
+        Subtrees ending before lo are skipped, but nodes on the way to each result may themselves
+        end before lo, which costs up to a path of the tree per result in the worst case
+        :param lo: start of the query interval
+        :param hi: end of the query interval
+        :return: generator of intervals sharing at least one point with [lo, hi], by ascending start
+        """
+        stack = []
+        node = self.root
+        while True:
+            # Subtrees ending before lo hold no overlap
+            while node is not self.null_node and not node.max_end < lo:
+                stack.append(node)
+                node = node.left
+            if not stack:
+                return
+            node = stack.pop()
+            # Every later interval starts after this one, so after hi as well
+            if hi < node.val[0]:
+                return
+            if not node.val[1] < lo:
+                yield node.val
+            node = node.right
+
+    def stab(self, point):
+        """
+        Intervals containing a point
+        :param point: number
+        :return: generator of intervals by ascending start
+        """
+        return self.overlap(point, point)
+
+    def any_overlap(self, lo, hi):
+        """
+        Whether some interval overlaps [lo, hi], a single O(log n) descent
+        :param lo: start of the query interval
+        :param hi: end of the query interval
+        :return: an overlapping interval, None if there is none
+        """
+        node = self.root
+        while node is not self.null_node:
+            if not hi < node.val[0] and not node.val[1] < lo:
+                return node.val
+            # If the left subtree reaches lo, either it overlaps or nothing on the right can
+            if node.left is not self.null_node and not node.left.max_end < lo:
+                node = node.left
+            else:
+                node = node.right
+        return None
+
+    def _new_leaf(self, num, key=None):
+        if num[1] < num[0]:
+            raise ValueError("Interval {} ends before it starts".format(num))
+        return super(IntervalTree, self)._new_leaf(num, key)
+
+    def _refresh(self, node):
+        end = node.val[1]
+        if node.left.max_end is not None and end < node.left.max_end:
+            end = node.left.max_end
+        if node.right.max_end is not None and end < node.right.max_end:
+            end = node.right.max_end
+        node.max_end = end
+
+    def _link(self, node, parent):
+        # Skips the full path refresh of AugmentedRedBlackTree
+        super(AugmentedRedBlackTree, self)._link(node, parent)
+        # Ends only grow on the way up, stop at the first ancestor already covering the new one
+        while parent is not None and parent.max_end < node.max_end:
+            parent.max_end = node.max_end
+            parent = parent.parent
+
+
+def main():
+    iv_test_tree = IntervalTree.from_iterable([(15, 20), (10, 30), (17, 19), (5, 20), (12, 15), (30, 40)])
+    print(list(iv_test_tree.overlap(14, 16)))
+    print(list(iv_test_tree.stab(35)))
+    print(iv_test_tree.any_overlap(41, 50))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+@author: Michael Lin
+"""
+import mmap
+import os
+import sys
+import tempfile
+
+from RedBlackBinaryTree.RedBlackBinaryTree import _read_dump_header, RedBlackBinaryTree
+
+
+class MappedRedBlackTree:
+    """
+    Read-only red black tree working directly on an mmap of a file written by RedBlackBinaryTree.dump
+    Nothing is deserialized, a node is a pre-order position i with a subtree size s:
+    its left child is (i + 1, left_sizes[i]) and its right child is (i + 1 + left_sizes[i], s - 1 - left_sizes[i])
+    Opening is O(1) whatever the size, pages are read from disk as searches touch them
+    """
+    def __init__(self, path):
+        super(MappedRedBlackTree, self).__init__()
+        if sys.byteorder == 'big':
+            raise ValueError("Dump files are little-endian, use RedBlackBinaryTree.load on this machine")
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            self._file.close()
+            raise ValueError("{} is not a tree dump".format(path))
+        try:
+            key_code, size_code, count, (keys_at, sizes_at, colors_at, length) = _read_dump_header(self._map, path)
+            self._size = count
+            self._view = memoryview(self._map)
+            self._keys = self._view[keys_at:sizes_at].cast(key_code)
+            self._left_sizes = self._view[sizes_at:colors_at].cast(size_code)
+            self._colors = self._view[colors_at:length]
+        except ValueError:
+            # Nothing is left open behind a file that is not a dump
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Release the mapping, the tree cannot be used afterwards
+        :return: None
+        """
+        # Views have to be released before the mapping can be closed
+        for view in ('_keys', '_left_sizes', '_colors', '_view'):
+            if hasattr(self, view):
+                getattr(self, view).release()
+        self._map.close()
+        self._file.close()
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, key):
+        return self.find(key)
+
+    def color(self, i):
+        """
+        Color of the node at a pre-order position
+        :param i: position
+        :return: 1 for red, 0 for black
+        """
+        return self._colors[i >> 3] >> (i & 7) & 1
+
+    def find(self, num):
+        """
+        Membership test walking the implicit tree from the root
+        :param num: desired number
+        :return: Boolean
+        """
+        keys = self._keys
+        left_sizes = self._left_sizes
+        i = 0
+        size = self._size
+        while size:
+            key = keys[i]
+            if num < key:
+                size = left_sizes[i]
+                i += 1
+            elif key < num:
+                left_size = left_sizes[i]
+                i += 1 + left_size
+                size -= 1 + left_size
+            else:
+                return True
+        return False
+
+    def floor(self, num):
+        """
+        Largest value smaller than or equal to num
+        :param num: number
+        :return: value, None if there is none
+        """
+        keys = self._keys
+        left_sizes = self._left_sizes
+        best = None
+        i = 0
+        size = self._size
+        while size:
+            key = keys[i]
+            if num < key:
+                size = left_sizes[i]
+                i += 1
+            elif key < num:
+                best = key
+                left_size = left_sizes[i]
+                i += 1 + left_size
+                size -= 1 + left_size
+            else:
+                return key
+        return best
+
+    def ceiling(self, num):
+        """
+        Smallest value greater than or equal to num
+        :param num: number
+        :return: value, None if there is none
+        """
+        keys = self._keys
+        left_sizes = self._left_sizes
+        best = None
+        i = 0
+        size = self._size
+        while size:
+            key = keys[i]
+            if num < key:
+                best = key
+                size = left_sizes[i]
+                i += 1
+            elif key < num:
+                left_size = left_sizes[i]
+                i += 1 + left_size
+                size -= 1 + left_size
+            else:
+                return key
+        return best
+
+    def __iter__(self):
+        return self.irange()
+
+    def irange(self, lo=None, hi=None, inclusive=(True, True)):
+        """
+        Lazy ascending range scan, seeking to lo in O(log n)
+        :param lo: lower bound, None for unbounded
+        :param hi: upper bound, None for unbounded
+        :param inclusive: pair of booleans telling whether lo and hi themselves are included
+        :return: generator of values
+        """
+        keys = self._keys
+        left_sizes = self._left_sizes
+        # Stack of (position, subtree size) whose key and right subtree are still to be visited
+        stack = []
+        i = 0
+        size = self._size
+        while size:
+            key = keys[i]
+            if lo is not None and (key < lo or (key == lo and not inclusive[0])):
+                # Everything on the left is out of range too
+                left_size = left_sizes[i]
+                i += 1 + left_size
+                size -= 1 + left_size
+            else:
+                stack.append((i, size))
+                size = left_sizes[i]
+                i += 1
+
+        while stack:
+            i, size = stack.pop()
+            key = keys[i]
+            if hi is not None and (hi < key or (key == hi and not inclusive[1])):
+                return
+            yield key
+            left_size = left_sizes[i]
+            i += 1 + left_size
+            size -= 1 + left_size
+            while size:
+                stack.append((i, size))
+                size = left_sizes[i]
+                i += 1
+
+
+def main():
+    path = os.path.join(tempfile.mkdtemp(), 'tree.rbt')
+    RedBlackBinaryTree.from_iterable([55, 40, 30, 35, 70, 65]).dump(path)
+    print(RedBlackBinaryTree.load(path).preorder_print_tree())
+    with MappedRedBlackTree(path) as mp_test_tree:
+        print(len(mp_test_tree), 35 in mp_test_tree, 50 in mp_test_tree)
+        print(list(mp_test_tree.irange(35, 65)))
+    os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
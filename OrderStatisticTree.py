@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+@author: Michael Lin
+"""
+import operator
+
+from RedBlackBinaryTree.RedBlackBinaryTree import Node, RedBlackBinaryTree
+
+
+class SizedNode(Node):
+    __slots__ = ('size',)
+
+    def __init__(self, val):
+        super(SizedNode, self).__init__(val)
+        # Number of nodes in the subtree rooted here
+        self.size = 1
+
+
+class OrderStatisticTree(RedBlackBinaryTree):
+    """
+    Red black tree augmented with subtree sizes, giving rank and select in O(log n)
+    Indexing works on positions like a sorted list, use get/pop for key lookups
+    """
+    _node_class = SizedNode
+    _augmented = True
+
+    def __init__(self, key=None):
+        super(OrderStatisticTree, self).__init__(key)
+        self.null_node.size = 0
+
+    @property
+    def _size(self):
+        # The root already holds the count, so split() and join() results need no counting walk
+        return self.root.size
+
+    @_size.setter
+    def _size(self, size):
+        self._count = size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._size)
+            if step == 1:
+                return list(self.islice(start, stop))
+            if step == -1:
+                # Reverse positions count from the largest value
+                return list(self.islice(self._size - 1 - start, self._size - 1 - stop, reverse=True))
+            # Only the selected positions are visited, each one a select in O(log n)
+            return [self._select_node(k).val for k in range(start, stop, step)]
+        index = operator.index(index)
+        return self._select_node(index).val
+
+    def __setitem__(self, index, value):
+        raise TypeError("Positions follow the sort order, use insert() instead")
+
+    def __delitem__(self, index):
+        index = operator.index(index)
+        self._delete_node(self._select_node(index))
+
+    def rank(self, num):
+        """
+        Number of values strictly smaller than num
+        :param num: number
+        :return: position num would be inserted at, before any equal values
+        """
+        key = self._sort_key(num)
+        rank = 0
+        node = self.root
+        while node is not self.null_node:
+            if node.key < key:
+                rank += node.left.size + 1
+                node = node.right
+            else:
+                node = node.left
+        return rank
+
+    def _rank_right(self, num):
+        """
+        Number of values smaller than or equal to num
+        :param num: number
+        :return: position num would be inserted at, after any equal values
+        """
+        key = self._sort_key(num)
+        rank = 0
+        node = self.root
+        while node is not self.null_node:
+            if key < node.key:
+                node = node.left
+            else:
+                rank += node.left.size + 1
+                node = node.right
+        return rank
+
+    def select(self, k):
+        """
+        k-th smallest value, negative k counts from the largest like list indexing
+        :param k: position
+        :return: value at position k
+        """
+        k = operator.index(k)
+        return self._select_node(k).val
+
+    def count_range(self, lo, hi, inclusive=(True, True)):
+        """
+        Number of values between lo and hi without walking the range
+        :param lo: lower bound
+        :param hi: upper bound
+        :param inclusive: pair of booleans telling whether lo and hi themselves are included
+        :return: count of values in range
+        """
+        start = self.rank(lo) if inclusive[0] else self._rank_right(lo)
+        stop = self._rank_right(hi) if inclusive[1] else self.rank(hi)
+        return max(0, stop - start)
+
+    def islice(self, start=None, stop=None, reverse=False):
+        """
+        Lazy positional slice, seeks to start in O(log n) instead of walking there
+        :param start: first position, None for the beginning
+        :param stop: position to stop before, None for the end
+        :param reverse: count positions and yield from the largest value down
+        :return: generator of values
+        """
+        start, stop, _ = slice(start, stop).indices(self._size)
+        if start >= stop:
+            return
+        first = self._size - 1 - start if reverse else start
+        # Inorder stack positioned at the first node, holding the ancestors still to be visited
+        stack = []
+        node = self.root
+        k = first
+        while True:
+            left_size = node.left.size
+            if k < left_size:
+                if not reverse:
+                    stack.append(node)
+                node = node.left
+            elif k > left_size:
+                if reverse:
+                    stack.append(node)
+                k -= left_size + 1
+                node = node.right
+            else:
+                break
+
+        remaining = stop - start
+        while remaining:
+            yield node.val
+            remaining -= 1
+            node = node.left if reverse else node.right
+            while node is not self.null_node:
+                stack.append(node)
+                node = node.right if reverse else node.left
+            if not stack:
+                return
+            node = stack.pop()
+
+    def _select_node(self, k):
+        """
+        Implementation of select
+        :param k: position
+        :return: node at position k
+        """
+        if k < 0:
+            k += self._size
+        if not 0 <= k < self._size:
+            raise IndexError("Tree index out of range")
+        node = self.root
+        while True:
+            left_size = node.left.size
+            if k < left_size:
+                node = node.left
+            elif k > left_size:
+                k -= left_size + 1
+                node = node.right
+            else:
+                return node
+
+    def _link(self, node, parent):
+        super(OrderStatisticTree, self)._link(node, parent)
+        while parent is not None:
+            parent.size += 1
+            parent = parent.parent
+
+    def _delete_node(self, curr):
+        # The node physically leaving its position is curr itself or, with two children, its successor
+        if curr.left is self.null_node or curr.right is self.null_node:
+            removed = curr
+        else:
+            removed = self._minVal(curr.right)
+        parent = removed.parent
+        while parent is not None:
+            parent.size -= 1
+            parent = parent.parent
+        # The successor takes over curr's place and therefore its (already decremented) size
+        removed.size = curr.size
+        super(OrderStatisticTree, self)._delete_node(curr)
+
+    def _relink(self, nodes):
+        root = super(OrderStatisticTree, self)._relink(nodes)
+
+        def count(lo, hi):
+            if lo >= hi:
+                return
+            mid = (lo + hi) // 2
+            nodes[mid].size = hi - lo
+            count(lo, mid)
+            count(mid + 1, hi)
+
+        count(0, len(nodes))
+        return root
+
+    def _refresh(self, node):
+        node.size = node.left.size + node.right.size + 1
+
+    def left_rotate(self, node):
+        tmp = node.right
+        super(OrderStatisticTree, self).left_rotate(node)
+        tmp.size = node.size
+        node.size = node.left.size + node.right.size + 1
+
+    def right_rotate(self, node):
+        tmp = node.left
+        super(OrderStatisticTree, self).right_rotate(node)
+        tmp.size = node.size
+        node.size = node.left.size + node.right.size + 1
+
+
+def main():
+    os_test_tree = OrderStatisticTree.from_iterable([55, 40, 30, 35, 70, 65])
+    print(os_test_tree.inorder_print_tree())
+    print("Rank of 55: {}".format(os_test_tree.rank(55)))
+    print("Select 2: {}".format(os_test_tree.select(2)))
+    print("Count in [35, 60]: {}".format(os_test_tree.count_range(35, 60)))
+    print("Positions 1 to 4: {}".format(os_test_tree[1:4]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,512 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+@author: Michael Lin
+"""
+import operator
+
+from RedBlackBinaryTree.RedBlackBinaryTree import Node, RedBlackBinaryTree, _refused
+
+
+class PersistentNode(Node):
+    __slots__ = ('owner',)
+
+    def __init__(self, val):
+        super(PersistentNode, self).__init__(val)
+        # Version allowed to modify this node in place, every other version has to copy it first
+        self.owner = None
+
+
+# Sentinel shared by every persistent tree, so that join() can mix the nodes of two trees without
+# relinking their leaves, none of the persistent operations writes to it
+_NULL_NODE = PersistentNode(None)
+_NULL_NODE.color = 0
+_NULL_NODE.left = None
+_NULL_NODE.right = None
+
+
+class PersistentRedBlackTree(RedBlackBinaryTree):
+    """
+    Copy-on-write red black tree, snapshot() is O(1) and versions share every untouched subtree
+    Nodes have no parent pointers, so mutations walk down with an explicit path and copy the nodes
+    on it that belong to another version, O(log n) new nodes per mutation at most
+    Nodes reachable from a snapshot are never modified again, so old versions can be read and
+    iterated from other threads while the head keeps changing
+    split() and join() copy the O(log n) nodes along the cut or the seam and leave snapshots intact,
+    cursors and set operations need parent pointers and raise TypeError
+    """
+    _node_class = PersistentNode
+    _parent_pointers = False
+
+    def __init__(self, key=None):
+        super(PersistentRedBlackTree, self).__init__(key)
+        self.null_node = self.root = _NULL_NODE
+        self._owner = object()
+
+    def snapshot(self):
+        """
+        Freeze the current version
+        :return: PersistentRedBlackTree sharing all nodes with this one
+        """
+        snap = type(self)(key=self.key)
+        snap.null_node = self.null_node
+        snap.root = self.root
+        snap._size = self._size
+        # From now on the head does not own any existing node either
+        self._owner = object()
+        return snap
+
+    def restore(self, snap):
+        """
+        Roll the head back to a snapshot
+        :param snap: PersistentRedBlackTree returned by snapshot()
+        :return: None
+        """
+        self.root = snap.root
+        self._size = snap._size
+        self._owner = object()
+
+    @classmethod
+    def load(cls, path):
+        tree = super(PersistentRedBlackTree, cls).load(path)
+        # Same as _relink, no parent pointers and every node owned by the head
+        for node in tree._preorder_nodes():
+            node.parent = None
+            node.owner = tree._owner
+        return tree
+
+    def __setitem__(self, key, value):
+        sort_key = self._sort_key(key)
+        path = self._own_path(sort_key)
+        if path and not sort_key < path[-1].key and not path[-1].key < sort_key:
+            path[-1].value = value
+        else:
+            self._insert_node(self._new_leaf(key, sort_key)).value = value
+
+    def __delitem__(self, key):
+        if self._delete_key(self._sort_key(key)) is None:
+            raise KeyError(key)
+
+    def pop(self, key, *default):
+        node = self._delete_key(self._sort_key(key))
+        if node is None:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        return node.value
+
+    def insert_many(self, keys):
+        if self._stats is not None and not self._stats._busy:
+            return self._stats._call('insert_many', type(self).insert_many, self, keys)
+        for node in sorted((self._new_leaf(num) for num in keys), key=operator.attrgetter('key')):
+            self._insert_node(node)
+
+    def delete(self, node, num):
+        """
+        Removal, the search always starts from the root because the path has to be copied
+        :param node: unused, kept for the RedBlackBinaryTree signature
+        :param num: number to be removed
+        :return: None
+        """
+        if self._stats is not None and not self._stats._busy:
+            return self._stats._call('delete', type(self).delete, self, node, num)
+        if self._delete_key(self._sort_key(num)) is None:
+            print("Node not found")
+
+    def delete_many(self, keys):
+        if self._stats is not None and not self._stats._busy:
+            return self._stats._call('delete_many', type(self).delete_many, self, keys)
+        removed = 0
+        for key in sorted(keys if self.key is None else map(self.key, keys)):
+            if self._delete_key(key) is not None:
+                removed += 1
+        return removed
+
+    # Cursors move along parent pointers, and the set operations relink nodes in place
+    cursor = _merge_operation = _set_operation = _refused(
+        "PersistentRedBlackTree does not support cursors or set operations")
+
+    def _split(self, node, bh, key):
+        """
+        _split that leaves the subtree untouched, the nodes it relinks are copied by _join if another version
+        still shares them
+        :param node: subtree root
+        :param bh: black height of the subtree
+        :param key: sort key
+        :return: (root of keys < key, its black height, root of keys >= key, its black height)
+        """
+        if node is self.null_node:
+            return self.null_node, 0, self.null_node, 0
+        left, right, child_bh = node.left, node.right, bh - (node.color == 0)
+        if node.key < key:
+            right_left, right_left_bh, right_right, right_right_bh = self._split(right, child_bh, key)
+            joined, joined_bh = self._join(left, child_bh, node, right_left, right_left_bh)
+            return joined, joined_bh, right_right, right_right_bh
+        left_left, left_left_bh, left_right, left_right_bh = self._split(left, child_bh, key)
+        joined, joined_bh = self._join(left_right, left_right_bh, node, right, child_bh)
+        return left_left, left_left_bh, joined, joined_bh
+
+    def _join(self, left, left_bh, node, right, right_bh):
+        """
+        _join on an owned spine: the nodes walked down the taller side are owned first and
+        _insert_rebalance fixes the owned path, so versions sharing the subtrees never see a change
+        :param left: subtree root of keys <= node.key
+        :param left_bh: black height of left
+        :param node: node placed between them, copied if another version owns it
+        :param right: subtree root of keys >= node.key
+        :param right_bh: black height of right
+        :return: (root of the joined subtree, its black height)
+        """
+        node = self._writable(node)
+        # Roots are painted black so that only the joining point can create a red-red edge
+        if left.color == 1:
+            left = self._writable(left)
+            left.color = 0
+            left_bh += 1
+        if right.color == 1:
+            right = self._writable(right)
+            right.color = 0
+            right_bh += 1
+
+        if left_bh == right_bh:
+            node.left, node.right = left, right
+            node.color = 0
+            return node, left_bh + 1
+
+        # The taller subtree stands in as the root, so that _own and the rotations can replace it
+        saved_root = self.root
+        taller_is_left = left_bh > right_bh
+        self.root = left if taller_is_left else right
+        target = right_bh if taller_is_left else left_bh
+        path = []
+        parent = None
+        curr, height = self.root, max(left_bh, right_bh)
+        while curr.color == 1 or height > target:
+            height -= curr.color == 0
+            curr = self._own(curr, parent)
+            path.append(curr)
+            parent = curr
+            curr = curr.right if taller_is_left else curr.left
+
+        node.color = 1
+        if taller_is_left:
+            node.left, node.right = curr, right
+            parent.right = node
+        else:
+            node.left, node.right = left, curr
+            parent.left = node
+        path.append(node)
+        # Rotations keep the black height, only a repainted root adds one
+        bh = max(left_bh, right_bh)
+        if self._insert_rebalance(path):
+            bh += 1
+        root = self.root
+        self.root = saved_root
+        return root, bh
+
+    def _climb(self, node, key):
+        # Without parent pointers every search restarts from the root
+        return self.root
+
+    def _relink(self, nodes):
+        root = super(PersistentRedBlackTree, self)._relink(nodes)
+        # Parent pointers would pin old versions in memory, drop them
+        for node in nodes:
+            node.parent = None
+            node.owner = self._owner
+        return root
+
+    def _own(self, node, parent):
+        """
+        Make node writable by this version, copying it if another version owns it
+        :param node: node
+        :param parent: node's parent, already owned, None if node is the root
+        :return: the writable node, now linked below parent
+        """
+        copy = self._writable(node)
+        if copy is not node:
+            self._replace_child(parent, node, copy)
+        return copy
+
+    def _writable(self, node):
+        """
+        Node itself if this version owns it, otherwise an owned copy that nothing links to yet
+        :param node: node
+        :return: node this version may modify
+        """
+        if node.owner is self._owner:
+            return node
+        copy = self._node_class(node.val)
+        copy.key = node.key
+        copy.value = node.value
+        copy.color = node.color
+        copy.left = node.left
+        copy.right = node.right
+        copy.owner = self._owner
+        return copy
+
+    def _replace_child(self, parent, old, new):
+        if parent is None:
+            self.root = new
+        elif parent.left is old:
+            parent.left = new
+        else:
+            parent.right = new
+
+    def _own_path(self, key):
+        """
+        Search for a sort key, owning every node on the way
+        :param key: desired sort key
+        :return: list of owned nodes from the root down to the match or the last node visited
+        """
+        path = []
+        parent = None
+        node = self.root
+        while node is not self.null_node:
+            node = self._own(node, parent)
+            path.append(node)
+            if key < node.key:
+                node = node.left
+            elif node.key < key:
+                node = node.right
+            else:
+                break
+            parent = path[-1]
+        return path
+
+    def _rotate_left(self, node, parent):
+        """
+        Left rotation without parent pointers, node and node.right have to be owned
+        :param node: node
+        :param parent: node's parent, None if node is the root
+        :return: None
+        """
+        tmp = node.right
+        node.right = tmp.left
+        tmp.left = node
+        self._replace_child(parent, node, tmp)
+
+    def _rotate_right(self, node, parent):
+        """
+        Right rotation without parent pointers, node and node.left have to be owned
+        :param node: node
+        :param parent: node's parent, None if node is the root
+        :return: None
+        """
+        tmp = node.left
+        node.left = tmp.right
+        tmp.right = node
+        self._replace_child(parent, node, tmp)
+
+    def _insert_node(self, new_node, finger=None):
+        key = new_node.key
+        path = []
+        parent = None
+        node = self.root
+        while node is not self.null_node:
+            node = self._own(node, parent)
+            path.append(node)
+            parent = node
+            node = node.left if key < node.key else node.right
+
+        new_node.owner = self._owner
+        self._size += 1
+        if parent is None:
+            self.root = new_node
+        elif key < parent.key:
+            parent.left = new_node
+        else:
+            parent.right = new_node
+        path.append(new_node)
+        self._insert_rebalance(path)
+        return new_node
+
+    def _insert_rebalance(self, path):
+        """
+        insert_rebalance working on the owned search path instead of parent pointers
+        :param path: owned nodes from the root down to the new node
+        :return: True if the root had turned red and was repainted, the black height then grew by one
+        """
+        i = len(path) - 1
+        # Parent is red, so it is not the root and a grandparent exists
+        while i >= 2 and path[i - 1].color == 1:
+            node, parent, grandparent = path[i], path[i - 1], path[i - 2]
+            great_grandparent = path[i - 3] if i >= 3 else None
+            if parent is grandparent.right:
+                uncle = grandparent.left
+                # CASE 1: red uncle, flip colors and repeat upward
+                if uncle.color == 1:
+                    uncle = self._own(uncle, grandparent)
+                    uncle.color = 0
+                    parent.color = 0
+                    grandparent.color = 1
+                    i -= 2
+                    continue
+                # CASE 2: RL case, transition to RR case
+                if node is parent.left:
+                    self._rotate_right(parent, grandparent)
+                    parent = node
+                # CASE 3: RR case
+                parent.color = 0
+                grandparent.color = 1
+                self._rotate_left(grandparent, great_grandparent)
+            else:
+                uncle = grandparent.right
+                # CASE 1: red uncle, flip colors and repeat upward
+                if uncle.color == 1:
+                    uncle = self._own(uncle, grandparent)
+                    uncle.color = 0
+                    parent.color = 0
+                    grandparent.color = 1
+                    i -= 2
+                    continue
+                # CASE 4: LR case, transition to LL case
+                if node is parent.right:
+                    self._rotate_left(parent, grandparent)
+                    parent = node
+                # CASE 5: LL case
+                parent.color = 0
+                grandparent.color = 1
+                self._rotate_right(grandparent, great_grandparent)
+            break
+        # The root is always on the path, so it is owned here
+        grew = self.root.color == 1
+        self.root.color = 0
+        return grew
+
+    def _delete_key(self, key):
+        """
+        Implementation of removal
+        :param key: sort key of the number to be removed
+        :return: the removed node, None if key is not in the tree
+        """
+        path = self._own_path(key)
+        if not path or key < path[-1].key or path[-1].key < key:
+            return None
+        curr = path[-1]
+        removed = self._node_class(curr.val)
+        removed.value = curr.value
+        self._size -= 1
+
+        if curr.left is not self.null_node and curr.right is not self.null_node:
+            # Two children, move the successor's entry up and remove the successor instead
+            parent = curr
+            node = self._own(curr.right, parent)
+            path.append(node)
+            while node.left is not self.null_node:
+                parent = node
+                node = self._own(node.left, parent)
+                path.append(node)
+            curr.val = node.val
+            curr.key = node.key
+            curr.value = node.value
+            curr = node
+
+        # curr has at most one child now
+        path.pop()
+        parent = path[-1] if path else None
+        is_left = parent is not None and parent.left is curr
+        replacement = curr.right if curr.left is self.null_node else curr.left
+        if replacement is not self.null_node:
+            replacement = self._own(replacement, curr)
+        self._replace_child(parent, curr, replacement)
+
+        if curr.color == 0:
+            self._delete_rebalance(replacement, is_left, path)
+        return removed
+
+    def _delete_rebalance(self, node, is_left, path):
+        """
+        delete_rebalance working on the owned ancestors of node instead of parent pointers
+        :param node: node carrying the extra black, owned unless it is the null_node
+        :param is_left: whether node sits on the left of its parent
+        :param path: owned ancestors of node from the root down
+        :return: None
+        """
+        # If node is double black situation
+        while path and node.color == 0:
+            parent = path[-1]
+            grandparent = path[-2] if len(path) >= 2 else None
+            if is_left:
+                sibling = self._own(parent.right, parent)
+                # CASE 1: if sibling is red
+                # Adjustment, rotate then reassign sibling
+                if sibling.color == 1:
+                    sibling.color = 0
+                    parent.color = 1
+                    self._rotate_left(parent, grandparent)
+                    path.insert(len(path) - 1, sibling)
+                    grandparent = sibling
+                    sibling = self._own(parent.right, parent)
+                # CASE 2: if sibling is black and children are both black
+                # Recoloring, recolor then proceed upward
+                if sibling.left.color == 0 and sibling.right.color == 0:
+                    sibling.color = 1
+                    node = path.pop()
+                    is_left = grandparent is not None and grandparent.left is node
+                    continue
+                # CASE 3: if sibling is black and children have red
+                # Restructuring, LL, LR, RR, RL cases
+                if sibling.right.color == 0:
+                    nephew = self._own(sibling.left, sibling)
+                    nephew.color = 0
+                    sibling.color = 1
+                    self._rotate_right(sibling, parent)
+                    sibling = nephew
+                sibling.color = parent.color
+                parent.color = 0
+                nephew = self._own(sibling.right, sibling)
+                nephew.color = 0
+                self._rotate_left(parent, grandparent)
+            else:
+                sibling = self._own(parent.left, parent)
+                # CASE 1: if sibling is red
+                # Adjustment, rotate then reassign sibling
+                if sibling.color == 1:
+                    sibling.color = 0
+                    parent.color = 1
+                    self._rotate_right(parent, grandparent)
+                    path.insert(len(path) - 1, sibling)
+                    grandparent = sibling
+                    sibling = self._own(parent.left, parent)
+                # CASE 2: if sibling is black and children are both black
+                # Recoloring, recolor then proceed upward
+                if sibling.left.color == 0 and sibling.right.color == 0:
+                    sibling.color = 1
+                    node = path.pop()
+                    is_left = grandparent is not None and grandparent.left is node
+                    continue
+                # CASE 3: if sibling is black and children have red
+                # Restructuring, LL, LR, RR, RL cases
+                if sibling.left.color == 0:
+                    nephew = self._own(sibling.right, sibling)
+                    nephew.color = 0
+                    sibling.color = 1
+                    self._rotate_left(sibling, parent)
+                    sibling = nephew
+                sibling.color = parent.color
+                parent.color = 0
+                nephew = self._own(sibling.left, sibling)
+                nephew.color = 0
+                self._rotate_right(parent, grandparent)
+            node = self.root
+            break
+        # Make sure the node is black, the null_node already is and is shared by all versions
+        if node is not self.null_node:
+            node.color = 0
+
+
+def main():
+    ps_test_tree = PersistentRedBlackTree.from_iterable([55, 40, 30, 35])
+    version_one = ps_test_tree.snapshot()
+    ps_test_tree.insert(70)
+    ps_test_tree.delete(ps_test_tree.root, 40)
+    print("Head: {}".format(ps_test_tree.inorder_print_tree()))
+    print("Snapshot: {}".format(version_one.inorder_print_tree()))
+    ps_test_tree.restore(version_one)
+    print("Restored: {}".format(ps_test_tree.inorder_print_tree()))
+
+
+if __name__ == '__main__':
+    main()
@@ -4,88 +4,652 @@ Created on Fri Apr 23 2021
 
 @author: Michael Lin
 """
+import array
 import collections
+import itertools
+import json
+import operator
+import random
+import struct
+import sys
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# File format written by RedBlackBinaryTree.dump, all little-endian:
+# header (magic, key typecode, left size typecode, count), keys in pre-order,
+# size of each node's left subtree in pre-order, then colors as a bitmap (bit set for red)
+_DUMP_MAGIC = b'RBT1'
+_DUMP_HEADER = struct.Struct('<4sccxxQ')
+
+
+def _dump_layout(size_code, count):
+    """
+    Byte offsets of the sections of a dump file
+    :param size_code: array typecode of the left subtree sizes
+    :param count: number of nodes
+    :return: (keys offset, left sizes offset, colors offset, total length)
+    """
+    keys_at = _DUMP_HEADER.size
+    sizes_at = keys_at + 8 * count
+    colors_at = sizes_at + array.array(size_code).itemsize * count
+    return keys_at, sizes_at, colors_at, colors_at + (count + 7) // 8
+
+
+def _read_dump_header(data, path):
+    """
+    Check the header of a dump file against its length before anything else is read
+    :param data: bytes-like content of the file
+    :param path: file path, for error messages
+    :return: (key typecode, left size typecode, count, layout from _dump_layout), ValueError for anything else
+    """
+    if len(data) < _DUMP_HEADER.size:
+        raise ValueError("{} is not a tree dump".format(path))
+    magic, key_code, size_code, count = _DUMP_HEADER.unpack_from(data)
+    if magic != _DUMP_MAGIC:
+        raise ValueError("{} is not a tree dump".format(path))
+    # The only typecodes dump writes, see _dump_typecode
+    if key_code not in (b'q', b'd') or size_code not in (b'I', b'Q'):
+        raise ValueError("{} has unknown typecodes".format(path))
+    layout = _dump_layout(size_code.decode(), count)
+    if len(data) != layout[-1]:
+        raise ValueError("{} is truncated or corrupt".format(path))
+    return key_code.decode(), size_code.decode(), count, layout
 
 
 class Node:
+    # Slotted so that each node carries no per-instance __dict__
+    # Big trees are dominated by node overhead: the seven slots, key and value included, take
+    # 88 bytes per node on 64-bit CPython 3.11, see Benchmark.memory_benchmark
+    __slots__ = ('parent', 'left', 'right', 'val', 'key', 'value', 'color')
+
     def __init__(self, val):
         super(Node, self).__init__()
         self.parent = None
         self.left = None
         self.right = None
         self.val = val
+        # Sort key compared by the tree, the value itself unless the tree has a key function
+        self.key = val
+        # Payload when the tree is used as a map, see RedBlackBinaryTree.__setitem__
+        self.value = None
         # Default red as 1 and black as 0
         self.color = 1
 
 
+def _dump_typecode(keys):
+    """
+    Array type able to hold every key of a dump exactly
+    :param keys: list of values
+    :return: 'q' for 64-bit integers, 'd' for floats and small enough integers, ValueError otherwise
+    """
+    types = set(map(type, keys))
+    if not types <= {int, float}:
+        raise ValueError("Only int and float keys can be dumped, not {}".format(
+            ', '.join(sorted(t.__name__ for t in types - {int, float}))))
+    if float not in types:
+        if keys and (min(keys) < -1 << 63 or max(keys) >= 1 << 63):
+            raise ValueError("Integer keys must fit in 64 bits to be dumped")
+        return 'q'
+    ints = [key for key in keys if type(key) is int]
+    if ints and (min(ints) < -1 << 53 or max(ints) > 1 << 53):
+        raise ValueError("Integer keys mixed with floats must stay within 2 ** 53 to be dumped exactly")
+    return 'd'
+
+
+def _refused(message):
+    """
+    Stand-in for the methods a subclass cannot support, usable as a method or a classmethod
+    :param message: reason given by the TypeError
+    :return: function raising TypeError(message) on every call
+    """
+    def refuse(*args, **kwargs):
+        raise TypeError(message)
+    return refuse
+
+
 class RedBlackBinaryTree:
-    def __init__(self):
+    # Batches at least 1 / _REBUILD_RATIO of the tree size are merged and rebuilt rather than applied key by key
+    _REBUILD_RATIO = 1
+    # Set operations between trees within a factor _MERGE_RATIO in size merge linearly instead of recursing
+    _MERGE_RATIO = 8
+    # Node type created by the tree, subclasses storing extra per-node fields swap it out
+    _node_class = Node
+    # Whether nodes point back to their parent, checked by validate()
+    _parent_pointers = True
+    # Whether _refresh keeps a per-node summary, so that joins have to refresh the nodes they relink
+    _augmented = False
+
+    def __init__(self, key=None):
         super(RedBlackBinaryTree, self).__init__()
+        # Function mapping a value to its sort key like sorted(), applied once per value and cached on its node
+        # None orders values by themselves with no call at all, use functools.cmp_to_key for comparators
+        self.key = key
         # Need to create a new type of node called null_node
         # This null_node is basically None but it has black color coded
-        self.null_node = Node(0)
+        # Its value is None rather than a number, so a comparison that reaches it fails loudly
+        self.null_node = self._node_class(None)
         self.null_node.color = 0
         self.null_node.left = None
         self.null_node.right = None
 
         # Assign root as a null node first
         self.root = self.null_node
+        self._size = 0
+        # TreeStats of the tree while enable_stats() is on
+        self._stats = None
 
     def __contains__(self, key):
         return self.find(key)
 
+    @classmethod
+    def from_sorted(cls, iterable, key=None):
+        """
+        Bulk-load a tree from sorted values in O(n) without rotations
+        :param iterable: values in non-decreasing order of their sort keys
+        :param key: key function of the new tree
+        :return: RedBlackBinaryTree
+        """
+        tree = cls(key=key)
+        nodes = [tree._new_leaf(num) for num in iterable]
+        for i in range(1, len(nodes)):
+            if nodes[i].key < nodes[i - 1].key:
+                raise ValueError("Input is not sorted at position {}".format(i))
+        tree.root = tree._relink(nodes)
+        tree._size = len(nodes)
+        return tree
+
+    @classmethod
+    def from_iterable(cls, iterable, key=None):
+        """
+        Bulk-load a tree from values in any order, sorting them first
+        :param iterable: values
+        :param key: key function of the new tree
+        :return: RedBlackBinaryTree
+        """
+        tree = cls(key=key)
+        nodes = [tree._new_leaf(num) for num in iterable]
+        nodes.sort(key=operator.attrgetter('key'))
+        tree.root = tree._relink(nodes)
+        tree._size = len(nodes)
+        return tree
+
+    def dump(self, path):
+        """
+        Write the tree shape, keys and colors to a compact binary file, values are not stored
+        Children are implicit: in pre-order a node's left child follows it and its right child
+        comes after the whole left subtree, so only the left subtree sizes are kept
+        Keys are stored as 64-bit integers, or as doubles if any of them is a float
+        :param path: file path
+        :return: None, ValueError for keys that cannot be stored exactly
+        """
+        if self.key is not None:
+            raise ValueError("Only trees ordered by their values can be dumped")
+        keys = []
+        left_sizes = []
+        colors = bytearray((self._size + 7) // 8)
+
+        # Recursion depth is bounded by twice the black height
+        def emit(node):
+            i = len(keys)
+            keys.append(node.val)
+            left_sizes.append(0)
+            if node.color == 1:
+                colors[i >> 3] |= 1 << (i & 7)
+            left_count = emit(node.left) if node.left is not self.null_node else 0
+            left_sizes[i] = left_count
+            right_count = emit(node.right) if node.right is not self.null_node else 0
+            return left_count + right_count + 1
+
+        if self.root is not self.null_node:
+            emit(self.root)
+        key_array = array.array(_dump_typecode(keys), keys)
+        size_array = array.array('I' if self._size < 1 << 32 else 'Q', left_sizes)
+        if sys.byteorder == 'big':
+            key_array.byteswap()
+            size_array.byteswap()
+        with open(path, 'wb') as handle:
+            handle.write(_DUMP_HEADER.pack(_DUMP_MAGIC, key_array.typecode.encode(),
+                                           size_array.typecode.encode(), self._size))
+            handle.write(key_array.tobytes())
+            handle.write(size_array.tobytes())
+            handle.write(colors)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read a tree written by dump, restoring the exact shape and colors without rebalancing
+        :param path: file path
+        :return: RedBlackBinaryTree
+        """
+        with open(path, 'rb') as handle:
+            data = handle.read()
+        key_code, size_code, count, (keys_at, sizes_at, colors_at, _) = _read_dump_header(data, path)
+        keys = array.array(key_code, data[keys_at:sizes_at])
+        left_sizes = array.array(size_code, data[sizes_at:colors_at])
+        if sys.byteorder == 'big':
+            keys.byteswap()
+            left_sizes.byteswap()
+        keys = keys.tolist()
+        colors = data[colors_at:]
+
+        tree = cls()
+        null_node = tree.null_node
+        node_class = tree._node_class
+
+        def build(i, size, parent):
+            if size == 0:
+                return null_node
+            node = node_class(keys[i])
+            node.parent = parent
+            node.color = colors[i >> 3] >> (i & 7) & 1
+            left_size = left_sizes[i]
+            node.left = build(i + 1, left_size, node)
+            node.right = build(i + 1 + left_size, size - 1 - left_size, node)
+            tree._refresh(node)
+            return node
+
+        tree.root = build(0, count, None)
+        tree._size = count
+        return tree
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def _size(self):
+        # None after split() and join(), the nodes are then counted on first use
+        if self._count is None:
+            self._count = sum(1 for _ in self._inorder_nodes())
+        return self._count
+
+    @_size.setter
+    def _size(self, size):
+        self._count = size
+
+    @property
+    def stats(self):
+        return self._stats
+
+    @property
+    def _reads_mutate(self):
+        # Whether lookups change the tree's state, here the counters of enable_stats()
+        return self._stats is not None
+
+    def enable_stats(self):
+        """
+        Start counting comparisons, nodes visited, rotations, recolors and rebalance iterations,
+        and timing the public operations
+        The counting hooks sit behind a single None check, so a tree without stats barely pays for them
+        :return: the TreeStats being filled, also available as tree.stats
+        """
+        # Imported here since TreeStats builds on this module
+        from RedBlackBinaryTree.TreeStats import TreeStats
+        if self._stats is None:
+            self._stats = TreeStats()
+        return self._stats
+
+    def disable_stats(self):
+        """
+        Stop counting
+        :return: the TreeStats filled so far, None if stats were not enabled
+        """
+        stats = self._stats
+        self._stats = None
+        return stats
+
+    def cursor(self, num=None):
+        """
+        Cursor for local access, see Cursor
+        :param num: the cursor starts on the smallest value >= num, on the smallest value if None
+        :return: Cursor
+        """
+        cursor = Cursor(self, None)
+        if num is None:
+            if self.root is not self.null_node:
+                cursor._node = self._minVal(self.root)
+        else:
+            cursor.seek(num)
+        return cursor
+
+    def validate(self, samples=None):
+        """
+        Check the red black tree invariants: black root and null_node, no red node with a red child,
+        the same number of black nodes on every path, keys in order and parent pointers matching
+        The full check is an O(n) walk with an explicit stack, so it works at any depth
+        :param samples: None for the full check, otherwise the number of random root to leaf
+                        paths checked, O(samples * log n), cheap enough to run on a live tree
+        :return: None, raises ValueError naming the first broken invariant
+        """
+        null_node = self.null_node
+        if null_node.color != 0:
+            raise ValueError("null_node is red")
+        if self.root is null_node:
+            if self._size:
+                raise ValueError("Empty tree with size {}".format(self._size))
+            return
+        if self.root.color != 0:
+            raise ValueError("Root {} is red".format(self.root.val))
+        if self._parent_pointers and self.root.parent is not None:
+            raise ValueError("Root {} has a parent".format(self.root.val))
+        if samples is not None:
+            self._validate_paths(samples)
+            return
+
+        # In-order walk carrying the number of black nodes from the root, compared at every leaf
+        black_height = None
+        count = 0
+        prev = None
+        stack = []
+        node, blacks = self.root, 0
+        while True:
+            while node is not null_node:
+                self._validate_children(node)
+                blacks += 1 - node.color
+                stack.append((node, blacks))
+                node = node.left
+            if black_height is None:
+                black_height = blacks
+            elif blacks != black_height:
+                raise ValueError("Paths with {} and {} black nodes".format(black_height, blacks))
+            if not stack:
+                break
+            node, blacks = stack.pop()
+            count += 1
+            if prev is not None and node.key < prev.key:
+                raise ValueError("{} comes after {}".format(node.val, prev.val))
+            prev = node
+            node = node.right
+        if count != self._size:
+            raise ValueError("{} nodes for size {}".format(count, self._size))
+
+    def _validate_paths(self, samples):
+        """
+        Sampled mode of validate, random descents checked against the leftmost path
+        :param samples: number of paths
+        :return: None
+        """
+        null_node = self.null_node
+        black_height = self._black_height(self.root)
+        for _ in range(samples):
+            # Keys on the way must stay between the bounds set by the turns taken above them
+            lo = hi = None
+            node, blacks = self.root, 0
+            while node is not null_node:
+                if (lo is not None and node.key < lo.key) or (hi is not None and hi.key < node.key):
+                    raise ValueError("{} is out of order".format(node.val))
+                self._validate_children(node)
+                blacks += 1 - node.color
+                if random.getrandbits(1):
+                    lo, node = node, node.right
+                else:
+                    hi, node = node, node.left
+            if blacks != black_height:
+                raise ValueError("Paths with {} and {} black nodes".format(black_height, blacks))
+
+    def _validate_children(self, node):
+        """
+        Checks of validate between a node and its children
+        :param node: node
+        :return: None
+        """
+        for child in (node.left, node.right):
+            if child is self.null_node:
+                continue
+            if self._parent_pointers and child.parent is not node:
+                raise ValueError("Parent pointer of {} does not lead to {}".format(child.val, node.val))
+            if node.color == 1 and child.color == 1:
+                raise ValueError("Red node {} has a red child {}".format(node.val, child.val))
+
+    def __getitem__(self, key):
+        node = self._find_node(key)
+        if node is None:
+            raise KeyError(key)
+        return node.value
+
+    def __setitem__(self, key, value):
+        sort_key = self._sort_key(key)
+        node = self._find_key(sort_key)
+        if node is None:
+            node = self._insert_node(self._new_leaf(key, sort_key))
+        # Existing keys are updated in place, no new node and no rebalancing
+        node.value = value
+
+    def __delitem__(self, key):
+        node = self._find_node(key)
+        if node is None:
+            raise KeyError(key)
+        self._delete_node(node)
+
+    def get(self, key, default=None):
+        """
+        Map lookup
+        :param key: key
+        :param default: returned when key is not in the tree
+        :return: value stored with key or default
+        """
+        node = self._find_node(key)
+        if node is None:
+            return default
+        return node.value
+
+    def pop(self, key, *default):
+        """
+        Map removal
+        :param key: key
+        :param default: optional value returned when key is not in the tree
+        :return: value stored with key, KeyError if missing and no default given
+        """
+        node = self._find_node(key)
+        if node is None:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        self._delete_node(node)
+        return node.value
+
+    def setdefault(self, key, default=None):
+        """
+        Map lookup that stores default when key is missing
+        :param key: key
+        :param default: value stored with key when key is not in the tree
+        :return: value stored with key
+        """
+        sort_key = self._sort_key(key)
+        node = self._find_key(sort_key)
+        if node is None:
+            node = self._insert_node(self._new_leaf(key, sort_key))
+            node.value = default
+        return node.value
+
+    def keys(self):
+        """
+        Keys in ascending order
+        :return: generator of keys
+        """
+        for node in self._inorder_nodes():
+            yield node.val
+
+    def values(self):
+        """
+        Values in ascending order of their keys
+        :return: generator of values
+        """
+        for node in self._inorder_nodes():
+            yield node.value
+
+    def items(self):
+        """
+        Key-value pairs in ascending order of keys
+        :return: generator of (key, value) tuples
+        """
+        for node in self._inorder_nodes():
+            yield node.val, node.value
+
     def insert(self, num):
         """
         Binary tree insertion
         :param num: number to be inserted
         :return: None
         """
-        # Create the new node
-        new_node = Node(num)
-        new_node.left = self.null_node
-        new_node.right = self.null_node
+        if self._stats is not None and not self._stats._busy:
+            return self._stats._call('insert', type(self).insert, self, num)
+        self._insert_node(self._new_leaf(num))
+
+    def insert_many(self, keys):
+        """
+        Batch insertion, keys are sorted first so that each search starts from the previous insertion
+        Large batches relative to the tree are merged and rebuilt in O(n) instead
+        :param keys: iterable of numbers to be inserted
+        :return: None
+        """
+        if self._stats is not None and not self._stats._busy:
+            return self._stats._call('insert_many', type(self).insert_many, self, keys)
+        new_nodes = [self._new_leaf(num) for num in keys]
+        # Stable sort keeps equal keys in arrival order, like repeated insert()
+        new_nodes.sort(key=operator.attrgetter('key'))
+        self._insert_nodes(new_nodes)
 
+    def _insert_nodes(self, new_nodes):
+        """
+        Implementation of insert_many
+        :param new_nodes: new leaves sorted by key
+        :return: None
+        """
+        if not new_nodes:
+            return
+        if len(new_nodes) * self._REBUILD_RATIO >= self._size:
+            nodes = list(self._inorder_nodes()) + new_nodes
+            # Existing equal keys stay ahead of the new ones
+            nodes.sort(key=operator.attrgetter('key'))
+            self.root = self._relink(nodes)
+            self._size = len(nodes)
+            return
+
+        finger = None
+        for node in new_nodes:
+            finger = self._insert_node(node, finger)
+
+    def _insert_node(self, new_node, finger=None):
+        """
+        Insert a new leaf whose sort key is already set
+        :param new_node: node from _new_leaf
+        :param finger: optional node close to the new one to start searching from instead of the root
+        :return: new_node
+        """
+        key = new_node.key
         # This implementation is different from the recursion method implemented in BinaryTree
         # Traversing while keeping track of parent
         parent = None
-        curr = self.root
-        while curr != self.null_node:
+        curr = self.root if finger is None else self._climb(finger, key)
+        while curr is not self.null_node:
             parent = curr
-            if new_node.val < curr.val:
+            if key < curr.key:
                 curr = curr.left
             else:
                 curr = curr.right
-        new_node.parent = parent
-
-        # Insert the node after we reach the bottom of the tree
-        # Compare with parent
-        if parent is None:
-            self.root = new_node
-        elif new_node.val < parent.val:
-            parent.left = new_node
-        else:
-            parent.right = new_node
+        self._link(new_node, parent)
 
         # Exit check before re-balancing
         # If root, double checking that the node has color black
         if new_node.parent is None:
             new_node.color = 0
-            return
+            return new_node
 
         # if grandparent doesn't exist, just return
         if new_node.parent.parent is None:
-            return
+            return new_node
 
         self.insert_rebalance(new_node)
+        return new_node
+
+    def _link(self, node, parent):
+        """
+        Attach a new leaf below parent
+        :param node: the new node
+        :param parent: the node found at the bottom of the search, None for an empty tree
+        :return: None
+        """
+        node.parent = parent
+        if self._count is not None:
+            self._count += 1
+        if self._stats is not None:
+            # The search that found the parent went through every node above the new leaf
+            self._stats._count_path(parent)
+
+        # Insert the node after we reach the bottom of the tree
+        # Compare with parent
+        if parent is None:
+            self.root = node
+        elif node.key < parent.key:
+            parent.left = node
+        else:
+            parent.right = node
+
+    def _climb(self, node, key):
+        """
+        Walk up from node to the node from which an insertion of key goes down
+        Only the ancestors bounding the range on the side of key are compared, the spine between
+        them is skipped, and the search goes down from the last one passed instead of from the
+        top of the climb, so no node is visited twice
+        :param node: starting node
+        :param key: sort key being looked for
+        :return: node whose subtree on the side of key holds the insertion point
+        """
+        if key < node.key:
+            while True:
+                # First ancestor greater than node, past the right spine node sits on
+                up = node
+                while up.parent is not None and up is up.parent.left:
+                    up = up.parent
+                if up.parent is None or not key < up.parent.key:
+                    return node
+                node = up.parent
+        while True:
+            up = node
+            while up.parent is not None and up is up.parent.right:
+                up = up.parent
+            if up.parent is None or key < up.parent.key:
+                return node
+            node = up.parent
+
+    def _relink(self, nodes):
+        """
+        Link already sorted nodes into a balanced subtree, middle node as the root
+        Every level but the last one is completely filled, so painting the last level red
+        and everything else black gives equal black height on every path
+        :param nodes: sorted list of nodes
+        :return: root node of the new subtree, null_node if nodes is empty
+        """
+        # Number of completely filled levels
+        full_levels = (len(nodes) + 1).bit_length() - 1
+
+        def build(lo, hi, depth, parent):
+            if lo >= hi:
+                return self.null_node
+            mid = (lo + hi) // 2
+            node = nodes[mid]
+            node.parent = parent
+            node.color = 1 if depth == full_levels else 0
+            node.left = build(lo, mid, depth + 1, node)
+            node.right = build(mid + 1, hi, depth + 1, node)
+            return node
+
+        return build(0, len(nodes), 0, None)
 
     def insert_rebalance(self, node):
         """
         Rebalance the color after insertion
         :param node: current node
-        :return: None
+        :return: True if the root had turned red and was repainted, the black height then grew by one
         """
+        stats = self._stats
         # If parent is red
         while node.parent.color == 1:
+            if stats is not None:
+                stats.rebalance_iterations += 1
             if node.parent == node.parent.parent.right:
                 # Find the uncle
                 uncle = node.parent.parent.left
@@ -96,6 +660,8 @@ class RedBlackBinaryTree:
                     uncle.color = 0
                     node.parent.color = 0
                     node.parent.parent.color = 1
+                    if stats is not None:
+                        stats.recolors += 3
                     node = node.parent.parent
                 else:
                     # CASE 2: if parent not black and not root, uncle is black
@@ -109,6 +675,8 @@ class RedBlackBinaryTree:
                     # RR case
                     node.parent.color = 0
                     node.parent.parent.color = 1
+                    if stats is not None:
+                        stats.recolors += 2
                     # Then we left rotate
                     self.left_rotate(node.parent.parent)
 
@@ -122,6 +690,8 @@ class RedBlackBinaryTree:
                     uncle.color = 0
                     node.parent.color = 0
                     node.parent.parent.color = 1
+                    if stats is not None:
+                        stats.recolors += 3
                     node = node.parent.parent
                 else:
                     # CASE 4: if parent not black and not root, uncle is black
@@ -135,6 +705,8 @@ class RedBlackBinaryTree:
                     # LL case
                     node.parent.color = 0
                     node.parent.parent.color = 1
+                    if stats is not None:
+                        stats.recolors += 2
                     # Then we right rotate
                     self.right_rotate(node.parent.parent)
 
@@ -144,7 +716,11 @@ class RedBlackBinaryTree:
 
         # After CASE 1, there is the possibility that the root has been recolored to red
         # To ensure that red black tree property is secured, repaint to black
+        grew = self.root.color == 1
+        if stats is not None:
+            stats.recolors += grew
         self.root.color = 0
+        return grew
 
     def right_rotate(self, node):
         """
@@ -152,6 +728,8 @@ class RedBlackBinaryTree:
         :param node: node
         :return: None
         """
+        if self._stats is not None:
+            self._stats.rotations += 1
         # Child rotation
         # Sibling transfers to grandparent's left side
         tmp = node.left
@@ -180,6 +758,8 @@ class RedBlackBinaryTree:
         :param node: node
         :return: None
         """
+        if self._stats is not None:
+            self._stats.rotations += 1
         # Child rotation
         # Sibling transfers to grandparent's right side
         tmp = node.right
@@ -209,12 +789,15 @@ class RedBlackBinaryTree:
         :param num: number to be removed
         :return: None
         """
+        if self._stats is not None and not self._stats._busy:
+            return self._stats._call('delete', type(self).delete, self, node, num)
         # Replicate the find function here for further operation after finding the match
+        key = self._sort_key(num)
         curr = self.null_node
         while node != self.null_node:
-            if node.val == num:
+            if not node.key < key and not key < node.key:
                 curr = node
-            if node.val > num:
+            if key < node.key:
                 node = node.left
             else:
                 node = node.right
@@ -223,6 +806,68 @@ class RedBlackBinaryTree:
             print("Node not found")
             return
 
+        self._delete_node(curr)
+
+    def delete_many(self, keys):
+        """
+        Batch removal, keys are sorted first so that each search starts from the previous removal
+        Large batches relative to the tree are filtered out and rebuilt in O(n) instead
+        Keys that are not in the tree are ignored
+        :param keys: iterable of numbers to be removed
+        :return: number of nodes removed
+        """
+        if self._stats is not None and not self._stats._busy:
+            return self._stats._call('delete_many', type(self).delete_many, self, keys)
+        # Only the sort keys are needed to find the nodes
+        keys = sorted(keys if self.key is None else map(self.key, keys))
+        if not keys or self.root is self.null_node:
+            return 0
+        if len(keys) * self._REBUILD_RATIO >= self._size:
+            # Merge-style walk over both sorted sequences, each key removes one matching node
+            kept = []
+            i = 0
+            for node in self._inorder_nodes():
+                while i < len(keys) and keys[i] < node.key:
+                    i += 1
+                if i < len(keys) and not node.key < keys[i]:
+                    i += 1
+                else:
+                    kept.append(node)
+            removed = self._size - len(kept)
+            self.root = self._relink(kept)
+            self._size = len(kept)
+            return removed
+
+        removed = 0
+        finger = None
+        for key in keys:
+            node = self.root if finger is None else self._climb(finger, key)
+            while node is not self.null_node:
+                finger = node
+                if key < node.key:
+                    node = node.left
+                elif node.key < key:
+                    node = node.right
+                else:
+                    break
+            if node is self.null_node:
+                continue
+            # The predecessor is never moved by the removal, so it stays a valid finger
+            finger = self._predecessor(node)
+            self._delete_node(node)
+            removed += 1
+        return removed
+
+    def _delete_node(self, curr):
+        """
+        Unlink a node from the tree and rebalance
+        :param curr: the node to be removed
+        :return: None
+        """
+        if self._stats is not None:
+            self._stats._count_path(curr)
+        if self._count is not None:
+            self._count -= 1
         tmp = curr
         tmp_color = tmp.color
         # Basic removal with one child or zero child
@@ -257,8 +902,11 @@ class RedBlackBinaryTree:
             self.delete_rebalance(replacement)
 
     def delete_rebalance(self, node):
+        stats = self._stats
         # If node is double black situation
         while node != self.root and node.color == 0:
+            if stats is not None:
+                stats.rebalance_iterations += 1
             if node == node.parent.left:
                 # Find the sibling
                 sibling = node.parent.right
@@ -267,12 +915,16 @@ class RedBlackBinaryTree:
                 if sibling.color == 1:
                     sibling.color = 0
                     sibling.parent.color = 1
+                    if stats is not None:
+                        stats.recolors += 2
                     self.left_rotate(node.parent)
                     sibling = node.parent.right
                 # CASE 2: if sibling is black and children are both black
                 # Recoloring, recolor then proceed upward
                 if sibling.left.color == 0 and sibling.right.color == 0:
                     sibling.color = 1
+                    if stats is not None:
+                        stats.recolors += 1
                     node = node.parent
                 else:
                     # CASE 3: if sibling is black and children have red
@@ -280,8 +932,12 @@ class RedBlackBinaryTree:
                     if sibling.right.color == 0:
                         sibling.left.color = 0
                         sibling.color = 1
+                        if stats is not None:
+                            stats.recolors += 2
                         self.right_rotate(sibling)
                         sibling = node.parent.right
+                    if stats is not None:
+                        stats.recolors += (sibling.color != node.parent.color) + node.parent.color + 1
                     sibling.color = node.parent.color
                     node.parent.color = 0
                     sibling.right.color = 0
@@ -294,12 +950,16 @@ class RedBlackBinaryTree:
                 if sibling.color == 1:
                     sibling.color = 0
                     node.parent.color = 1
+                    if stats is not None:
+                        stats.recolors += 2
                     self.right_rotate(node.parent)
                     sibling = node.parent.left
                 # CASE 2: if sibling is black and children are both black
                 # Recoloring, recolor then proceed upward
                 if sibling.left.color == 0 and sibling.right.color == 0:
                     sibling.color = 1
+                    if stats is not None:
+                        stats.recolors += 1
                     node = node.parent
                 else:
                     # CASE 3: if sibling is black and children have red
@@ -307,16 +967,533 @@ class RedBlackBinaryTree:
                     if sibling.left.color == 0:
                         sibling.right.color = 0
                         sibling.color = 1
+                        if stats is not None:
+                            stats.recolors += 2
                         self.left_rotate(sibling)
                         sibling = node.parent.left
+                    if stats is not None:
+                        stats.recolors += (sibling.color != sibling.parent.color) + node.parent.color + 1
                     sibling.color = sibling.parent.color
                     node.parent.color = 0
                     sibling.left.color = 0
                     self.right_rotate(node.parent)
                     node = self.root
         # Make sure the root node is black
+        if stats is not None:
+            stats.recolors += node.color
         node.color = 0
 
+    @classmethod
+    def join(cls, left, num, right):
+        """
+        Concatenate two trees around num, every value of left <= num <= every value of right
+        Both trees are consumed, O(log n) when they come from split() of the same tree, len() of the result
+        is counted on first use unless both sizes are already known
+        :param left: RedBlackBinaryTree
+        :param num: number placed between them
+        :param right: RedBlackBinaryTree
+        :return: new tree holding everything
+        """
+        if left.key is not right.key:
+            raise ValueError("Trees ordered by different key functions cannot be joined")
+        node = left._new_leaf(num)
+        if (left.root is not left.null_node and node.key < left._maxVal(left.root).key) or \
+                (right.root is not right.null_node and right._minVal(right.root).key < node.key):
+            raise ValueError("Values of left must be <= {} <= values of right".format(num))
+        # The result keeps the null_node of the bigger tree, the smaller one gets relinked to it
+        if left.null_node is not right.null_node:
+            if len(left) < len(right):
+                right._adopt(left)
+            else:
+                left._adopt(right)
+        # Spawned from left so that the result keeps its configuration
+        tree = left._spawn(left.null_node)
+        node.left = node.right = left.null_node
+        root, _ = tree._join(left.root, tree._black_height(left.root), node,
+                             right.root, tree._black_height(right.root))
+        tree.root = root
+        if left._count is not None and right._count is not None:
+            tree._size = left._count + right._count + 1
+        else:
+            tree._size = None
+        left._clear()
+        right._clear()
+        return tree
+
+    def split(self, num):
+        """
+        Cut the tree at num in O(log n), this tree is emptied
+        len() of either side counts its nodes on first use, which is O(size) once
+        :param num: number
+        :return: (tree of values < num, tree of values >= num), both sharing this tree's null_node
+        """
+        left_root, _, right_root, _ = self._split(self.root, self._black_height(self.root), self._sort_key(num))
+        left = self._spawn(self.null_node)
+        right = self._spawn(self.null_node)
+        left.root = left_root
+        right.root = right_root
+        left._size = None if left_root is not self.null_node else 0
+        right._size = None if right_root is not self.null_node else 0
+        self._clear()
+        return left, right
+
+    def union(self, other):
+        """
+        Set union, values are assumed to be distinct within each tree
+        O(m log n) leaf insertions when other is the smaller tree, O(m log(n / m + 1)) split and join otherwise
+        This tree becomes the result and other is emptied
+        :param other: RedBlackBinaryTree
+        :return: this tree
+        """
+        matches = [0]
+
+        def union(a, a_bh, b, b_bh):
+            if a is self.null_node:
+                return b, b_bh
+            if b is self.null_node:
+                return a, a_bh
+            b_left, b_right, child_bh = self._detach(b, b_bh)
+            a_left, a_left_bh, match, a_right, a_right_bh = self._split3(a, a_bh, b.key)
+            if match is not None:
+                # Equal keys keep the node of this tree, like the linear merge
+                matches[0] += 1
+                b = match
+            left, left_bh = union(a_left, a_left_bh, b_left, child_bh)
+            right, right_bh = union(a_right, a_right_bh, b_right, child_bh)
+            return self._join(left, left_bh, b, right, right_bh)
+
+        total = len(self) + len(other)
+        if self._merge_operation(other, True, True, True):
+            return self
+        if len(other) < len(self):
+            # Every level of a join is a Python call, so leaf insertions of the smaller tree come out ahead
+            self._size = total - self._graft(other)
+            return self
+        self._set_operation(other, union)
+        self._size = total - matches[0]
+        return self
+
+    def intersection(self, other):
+        """
+        Set intersection in O(m log(n / m + 1)), values are assumed to be distinct within each tree
+        This tree becomes the result and other is emptied
+        :param other: RedBlackBinaryTree
+        :return: this tree
+        """
+        matches = [0]
+
+        def intersection(a, a_bh, b, b_bh):
+            if a is self.null_node or b is self.null_node:
+                return self.null_node, 0
+            a_left, a_right, child_bh = self._detach(a, a_bh)
+            b_left, b_left_bh, match, b_right, b_right_bh = self._split3(b, b_bh, a.key)
+            left, left_bh = intersection(a_left, child_bh, b_left, b_left_bh)
+            right, right_bh = intersection(a_right, child_bh, b_right, b_right_bh)
+            if match is None:
+                return self._join2(left, left_bh, right, right_bh)
+            matches[0] += 1
+            return self._join(left, left_bh, a, right, right_bh)
+
+        if self._merge_operation(other, False, False, True):
+            return self
+        self._set_operation(other, intersection)
+        self._size = matches[0]
+        return self
+
+    def difference(self, other):
+        """
+        Set difference, values of this tree that are not in other, in O(m log(n / m + 1))
+        Values are assumed to be distinct within each tree
+        This tree becomes the result and other is emptied
+        :param other: RedBlackBinaryTree
+        :return: this tree
+        """
+        matches = [0]
+
+        def difference(a, a_bh, b, b_bh):
+            if a is self.null_node or b is self.null_node:
+                return a, a_bh
+            b_left, b_right, child_bh = self._detach(b, b_bh)
+            a_left, a_left_bh, match, a_right, a_right_bh = self._split3(a, a_bh, b.key)
+            if match is not None:
+                matches[0] += 1
+            left, left_bh = difference(a_left, a_left_bh, b_left, child_bh)
+            right, right_bh = difference(a_right, a_right_bh, b_right, child_bh)
+            return self._join2(left, left_bh, right, right_bh)
+
+        size = len(self)
+        if self._merge_operation(other, True, False, False):
+            return self
+        self._set_operation(other, difference)
+        self._size = size - matches[0]
+        return self
+
+    def symmetric_difference(self, other):
+        """
+        Values in exactly one of the trees, in O(m log(n / m + 1))
+        Values are assumed to be distinct within each tree
+        This tree becomes the result and other is emptied
+        :param other: RedBlackBinaryTree
+        :return: this tree
+        """
+        matches = [0]
+
+        def symmetric_difference(a, a_bh, b, b_bh):
+            if a is self.null_node:
+                return b, b_bh
+            if b is self.null_node:
+                return a, a_bh
+            a_left, a_right, child_bh = self._detach(a, a_bh)
+            b_left, b_left_bh, match, b_right, b_right_bh = self._split3(b, b_bh, a.key)
+            left, left_bh = symmetric_difference(a_left, child_bh, b_left, b_left_bh)
+            right, right_bh = symmetric_difference(a_right, child_bh, b_right, b_right_bh)
+            if match is None:
+                return self._join(left, left_bh, a, right, right_bh)
+            matches[0] += 1
+            return self._join2(left, left_bh, right, right_bh)
+
+        total = len(self) + len(other)
+        if self._merge_operation(other, True, True, False):
+            return self
+        self._set_operation(other, symmetric_difference)
+        self._size = total - 2 * matches[0]
+        return self
+
+    def _merge_operation(self, other, keep_self, keep_other, keep_both):
+        """
+        Linear merge of both trees for operands of comparable size, where it beats the recursive
+        split and join, O(n + m)
+        :param other: RedBlackBinaryTree, emptied afterwards if the merge happens
+        :param keep_self: keep values only found in this tree
+        :param keep_other: keep values only found in other
+        :param keep_both: keep values found in both trees
+        :return: True if the operation was done, False if it is left to the recursive version
+        """
+        if other is self:
+            raise ValueError("Set operations need two different trees")
+        if other.key is not self.key:
+            raise ValueError("Set operations need trees ordered by the same key function")
+        if min(len(self), len(other)) * self._MERGE_RATIO < max(len(self), len(other)):
+            return False
+        kept = []
+        mine = self._inorder_nodes()
+        theirs = other._inorder_nodes()
+        a = next(mine, None)
+        b = next(theirs, None)
+        while a is not None and b is not None:
+            if a.key < b.key:
+                if keep_self:
+                    kept.append(a)
+                a = next(mine, None)
+            elif b.key < a.key:
+                if keep_other:
+                    kept.append(b)
+                b = next(theirs, None)
+            else:
+                if keep_both:
+                    kept.append(a)
+                a = next(mine, None)
+                b = next(theirs, None)
+        if keep_self:
+            while a is not None:
+                kept.append(a)
+                a = next(mine, None)
+        if keep_other:
+            while b is not None:
+                kept.append(b)
+                b = next(theirs, None)
+        self.root = self._relink(kept)
+        self._size = len(kept)
+        other._clear()
+        return True
+
+    def _graft(self, other):
+        """
+        Move the nodes of a much smaller tree into this one as new leaves, O(m log n)
+        Values already in this tree keep their node, like the linear merge and the recursive union
+        :param other: RedBlackBinaryTree, emptied afterwards
+        :return: number of values of other that were already in this tree
+        """
+        nodes = list(other._inorder_nodes())
+        other._clear()
+        null_node = self.null_node
+        matches = 0
+        for node in nodes:
+            key = node.key
+            parent = None
+            curr = self.root
+            while curr is not null_node:
+                if key < curr.key:
+                    parent, curr = curr, curr.left
+                elif curr.key < key:
+                    parent, curr = curr, curr.right
+                else:
+                    break
+            if curr is not null_node:
+                matches += 1
+                continue
+            node.left = node.right = null_node
+            node.color = 1
+            if self._augmented:
+                self._refresh(node)
+            self._link(node, parent)
+            if parent is None:
+                node.color = 0
+            elif parent.parent is not None:
+                self.insert_rebalance(node)
+        return matches
+
+    def _set_operation(self, other, combine):
+        """
+        Run a recursive set operation on the two roots and keep the result in this tree
+        :param other: RedBlackBinaryTree, emptied afterwards
+        :param combine: function (a, a_bh, b, b_bh) -> (root, bh) on subtrees
+        :return: None
+        """
+        if other is self:
+            raise ValueError("Set operations need two different trees")
+        if len(self) < len(other):
+            other._adopt(self)
+        else:
+            self._adopt(other)
+        root, _ = combine(self.root, self._black_height(self.root), other.root, self._black_height(other.root))
+        self.root = root
+        other._clear()
+
+    def _spawn(self, null_node):
+        """
+        Empty tree of the same type built on an existing null_node
+        :param null_node: sentinel to share
+        :return: RedBlackBinaryTree
+        """
+        tree = type(self)(key=self.key)
+        tree.null_node = null_node
+        tree.root = null_node
+        return tree
+
+    def _clear(self):
+        self.root = self.null_node
+        self._size = 0
+
+    def _adopt(self, other):
+        """
+        Relink the leaves of other to this tree's null_node so that their nodes can be mixed, O(len(other))
+        :param other: RedBlackBinaryTree
+        :return: None
+        """
+        if other.null_node is self.null_node:
+            return
+        if other.root is other.null_node:
+            other.root = other.null_node = self.null_node
+            return
+        for node in list(other._inorder_nodes()):
+            if node.left is other.null_node:
+                node.left = self.null_node
+            if node.right is other.null_node:
+                node.right = self.null_node
+        other.null_node = self.null_node
+
+    def _sort_key(self, num):
+        return num if self.key is None else self.key(num)
+
+    def _new_leaf(self, num, key=None):
+        """
+        New red node with no children, the only place sort keys are computed for stored values
+        :param num: value
+        :param key: sort key of num when the caller already has it
+        :return: node
+        """
+        node = self._node_class(num)
+        if self.key is not None:
+            node.key = self.key(num) if key is None else key
+        node.left = self.null_node
+        node.right = self.null_node
+        return node
+
+    def _black_height(self, node):
+        """
+        Number of black nodes on every path from node down to a leaf
+        :param node: subtree root
+        :return: black height, 0 for the null_node
+        """
+        height = 0
+        while node is not self.null_node:
+            if node.color == 0:
+                height += 1
+            node = node.left
+        return height
+
+    def _detach(self, node, bh):
+        """
+        Take node out of its subtree, leaving its two children as separate subtrees
+        :param node: subtree root
+        :param bh: black height of the subtree
+        :return: (left subtree, right subtree, black height of both)
+        """
+        left, right = node.left, node.right
+        for child in (left, right):
+            if child is not self.null_node:
+                child.parent = None
+        node.left = node.right = self.null_node
+        node.parent = None
+        return left, right, bh - (node.color == 0)
+
+    def _split(self, node, bh, key):
+        """
+        Implementation of split on a detached subtree
+        :param node: subtree root
+        :param bh: black height of the subtree
+        :param key: sort key
+        :return: (root of keys < key, its black height, root of keys >= key, its black height)
+        """
+        if node is self.null_node:
+            return self.null_node, 0, self.null_node, 0
+        left, right, child_bh = self._detach(node, bh)
+        if node.key < key:
+            right_left, right_left_bh, right_right, right_right_bh = self._split(right, child_bh, key)
+            joined, joined_bh = self._join(left, child_bh, node, right_left, right_left_bh)
+            return joined, joined_bh, right_right, right_right_bh
+        left_left, left_left_bh, left_right, left_right_bh = self._split(left, child_bh, key)
+        joined, joined_bh = self._join(left_right, left_right_bh, node, right, child_bh)
+        return left_left, left_left_bh, joined, joined_bh
+
+    def _split3(self, node, bh, key):
+        """
+        Three-way split on a detached subtree, pulling out one node whose key equals key
+        :param node: subtree root
+        :param bh: black height of the subtree
+        :param key: sort key
+        :return: (root of keys < key, its black height, matching node or None,
+                  root of keys > key, its black height)
+        """
+        if node is self.null_node:
+            return self.null_node, 0, None, self.null_node, 0
+        left, right, child_bh = self._detach(node, bh)
+        if node.key < key:
+            right_left, right_left_bh, match, right_right, right_right_bh = self._split3(right, child_bh, key)
+            joined, joined_bh = self._join(left, child_bh, node, right_left, right_left_bh)
+            return joined, joined_bh, match, right_right, right_right_bh
+        if key < node.key:
+            left_left, left_left_bh, match, left_right, left_right_bh = self._split3(left, child_bh, key)
+            joined, joined_bh = self._join(left_right, left_right_bh, node, right, child_bh)
+            return left_left, left_left_bh, match, joined, joined_bh
+        return left, child_bh, node, right, child_bh
+
+    def _join(self, left, left_bh, node, right, right_bh):
+        """
+        Join two detached subtrees around a detached node
+        The taller subtree is walked down its inner spine to a black node of the other's black height,
+        node goes there as a red node and insert_rebalance fixes the rest
+        :param left: subtree root of keys <= node.key
+        :param left_bh: black height of left
+        :param node: detached node
+        :param right: subtree root of keys >= node.key
+        :param right_bh: black height of right
+        :return: (root of the joined subtree, its black height)
+        """
+        # Roots are painted black so that only the joining point can create a red-red edge
+        if left.color == 1:
+            left.color = 0
+            left_bh += 1
+        if right.color == 1:
+            right.color = 0
+            right_bh += 1
+
+        if left_bh == right_bh:
+            node.left, node.right, node.parent = left, right, None
+            node.color = 0
+            for child in (left, right):
+                if child is not self.null_node:
+                    child.parent = node
+            if self._augmented:
+                self._refresh(node)
+            return node, left_bh + 1
+
+        # Walk down the inner spine of the taller side
+        taller_is_left = left_bh > right_bh
+        parent = None
+        curr, height = (left, left_bh) if taller_is_left else (right, right_bh)
+        target = right_bh if taller_is_left else left_bh
+        while curr.color == 1 or height > target:
+            height -= curr.color == 0
+            parent = curr
+            curr = curr.right if taller_is_left else curr.left
+
+        node.color = 1
+        node.parent = parent
+        if taller_is_left:
+            node.left, node.right = curr, right
+            parent.right = node
+            short = right
+        else:
+            node.left, node.right = left, curr
+            parent.left = node
+            short = left
+        for child in (curr, short):
+            if child is not self.null_node:
+                child.parent = node
+        if self._augmented:
+            self._update_path(node)
+
+        # Rotations may reach the top of the subtree, so it stands in as the root for insert_rebalance
+        saved_root = self.root
+        self.root = left if taller_is_left else right
+        # Rotations keep the black height, only a repainted root adds one
+        bh = max(left_bh, right_bh)
+        if parent.color == 1 and self.insert_rebalance(node):
+            bh += 1
+        root = self.root
+        self.root = saved_root
+        return root, bh
+
+    def _join2(self, left, left_bh, right, right_bh):
+        """
+        Join two detached subtrees without a middle node, the maximum of left is split off to serve as one
+        :param left: subtree root of values <= those of right
+        :param left_bh: black height of left
+        :param right: subtree root
+        :param right_bh: black height of right
+        :return: (root of the joined subtree, its black height)
+        """
+        if left is self.null_node:
+            return right, right_bh
+        if right is self.null_node:
+            return left, left_bh
+        rest, rest_bh, node = self._split_last(left, left_bh)
+        return self._join(rest, rest_bh, node, right, right_bh)
+
+    def _split_last(self, node, bh):
+        """
+        Split the largest node off a detached subtree, joining back the left subtrees on the way down
+        :param node: subtree root, not the null_node
+        :param bh: black height of the subtree
+        :return: (root of the other nodes, its black height, detached largest node)
+        """
+        left, right, child_bh = self._detach(node, bh)
+        if right is self.null_node:
+            return left, child_bh, node
+        rest, rest_bh, last = self._split_last(right, child_bh)
+        joined, joined_bh = self._join(left, child_bh, node, rest, rest_bh)
+        return joined, joined_bh, last
+
+    def _refresh(self, node):
+        """
+        Hook for augmented subclasses, recompute node's summary from its two children
+        :param node: node whose children are up to date
+        :return: None
+        """
+        pass
+
+    def _update_path(self, node):
+        """
+        Refresh per-node summaries from node up to the root after a subtree has been attached below node
+        :param node: lowest node whose children changed
+        :return: None
+        """
+        while node is not None:
+            self._refresh(node)
+            node = node.parent
+
     def _parent_reassign(self, node1, node2):
         """
         Parent reassignment needed for removal
@@ -330,7 +1507,37 @@ class RedBlackBinaryTree:
             node1.parent.left = node2
         else:
             node1.parent.right = node2
-        node1.parent = node2.parent
+        node2.parent = node1.parent
+
+    def _predecessor(self, node):
+        """
+        Find the in-order predecessor through parent pointers
+        :param node: node
+        :return: the predecessor node, None if node holds the smallest value
+        """
+        if node.left is not self.null_node:
+            node = node.left
+            while node.right is not self.null_node:
+                node = node.right
+            return node
+        while node.parent is not None and node is node.parent.left:
+            node = node.parent
+        return node.parent
+
+    def _successor(self, node):
+        """
+        Find the in-order successor through parent pointers
+        :param node: node
+        :return: the successor node, None if node holds the largest value
+        """
+        if node.right is not self.null_node:
+            node = node.right
+            while node.left is not self.null_node:
+                node = node.left
+            return node
+        while node.parent is not None and node is node.parent.right:
+            node = node.parent
+        return node.parent
 
     def _minVal(self, node):
         """
@@ -342,114 +1549,614 @@ class RedBlackBinaryTree:
             node = node.left
         return node
 
-    def find(self, num):
+    def _maxVal(self, node):
+        """
+        Find the maximum value down the tree
+        :param node: node
+        :return: the maximum value node
+        """
+        while node.right != self.null_node:
+            node = node.right
+        return node
+
+    def _find_node(self, num):
         """
-        Binary tree search
+        Iterative search
         :param num: desired number
-        :return: Boolean True/False or None
+        :return: node holding num or None
         """
-        if self.root is not None:
-            return self._find(self.root, num)
-        else:
-            return None
+        return self._find_key(self._sort_key(num))
 
-    def _find(self, node, num):
+    def _find_key(self, key):
         """
-        Implementation of search
-        :param node: node
+        Iterative search by sort key
+        :param key: sort key
+        :return: node with that key or None
+        """
+        node = self.root
+        while node is not self.null_node:
+            if key < node.key:
+                node = node.left
+            elif node.key < key:
+                node = node.right
+            else:
+                return node
+        return None
+
+    def find(self, num):
+        """
+        Binary tree search, iterative so that lookups cost no Python call per level
         :param num: desired number
         :return: Boolean True/False
         """
-        if node.val == num:
-            return True
-        elif num < node.val and node.left != self.null_node:
-            return self._find(node.left, num)
-        elif num > node.val and node.right != self.null_node:
-            return self._find(node.right, num)
+        if self._stats is not None and not self._stats._busy:
+            return self._stats._call('find', type(self).find, self, num)
+        key = num if self.key is None else self.key(num)
+        null_node = self.null_node
+        node = self.root
+        while node is not null_node:
+            if key < node.key:
+                node = node.left
+            elif node.key < key:
+                node = node.right
+            else:
+                return True
+        return False
+
+    def contains_many(self, keys):
+        """
+        Batched membership test, probes are sorted and each search starts from where the previous one ended
+        :param keys: sequence of numbers
+        :return: Booleans in the order of keys, a boolean NumPy array for a NumPy array of keys and a list otherwise
+        """
+        if self._stats is not None and not self._stats._busy:
+            return self._stats._call('contains_many', type(self).contains_many, self, keys)
+        as_array = np is not None and isinstance(keys, np.ndarray)
+        if self.key is None and as_array:
+            order = np.argsort(keys, kind='stable')
+            found = np.zeros(len(keys), dtype=bool)
+            # Python scalars compare against the stored values much faster than NumPy scalars
+            probes = keys[order].tolist()
+            order = order.tolist()
         else:
-            return False
+            keys = list(keys if self.key is None else map(self.key, keys))
+            order = sorted(range(len(keys)), key=keys.__getitem__)
+            found = [False] * len(keys)
+            probes = [keys[i] for i in order]
 
-    def inorder_print_tree(self):
+        null_node = self.null_node
+        finger = None
+        for i, key in zip(order, probes):
+            node = self.root if finger is None else self._climb(finger, key)
+            while node is not null_node:
+                finger = node
+                if key < node.key:
+                    node = node.left
+                elif node.key < key:
+                    node = node.right
+                else:
+                    found[i] = True
+                    break
+        # Keyed trees go through the list path, the result still comes back as an array
+        return np.asarray(found, dtype=bool) if as_array else found
+
+    def floor(self, num):
         """
-        Binary Tree inorder presentation
-        :return: List of tree values
+        Largest value smaller than or equal to num
+        :param num: number
+        :return: value or None
         """
-        if self.root != self.null_node:
-            return self._inorder_traversal(self.root, res=[])
+        if self._stats is not None and not self._stats._busy:
+            return self._stats._call('floor', type(self).floor, self, num)
+        key = self._sort_key(num)
+        node = self.root
+        best = None
+        while node is not self.null_node:
+            if key < node.key:
+                node = node.left
+            else:
+                best = node
+                node = node.right
+        return None if best is None else best.val
 
-    def _inorder_traversal(self, node, res=[]):
+    def ceiling(self, num):
         """
-        Implementation of inorder traversal printing
-        :param node: node
-        :return: List of tree values
+        Smallest value larger than or equal to num
+        :param num: number
+        :return: value or None
         """
-        if node is not self.null_node:
-            self._inorder_traversal(node.left, res)
-            res.append(node.val)
-            self._inorder_traversal(node.right, res)
-            return res
+        if self._stats is not None and not self._stats._busy:
+            return self._stats._call('ceiling', type(self).ceiling, self, num)
+        key = self._sort_key(num)
+        node = self.root
+        best = None
+        while node is not self.null_node:
+            if node.key < key:
+                node = node.right
+            else:
+                best = node
+                node = node.left
+        return None if best is None else best.val
 
-    def preorder_print_tree(self):
+    def predecessor(self, num):
         """
-        Binary Tree preorder presentation
-        :return: List of tree values
+        Largest value strictly smaller than num
+        :param num: number
+        :return: value or None
         """
-        if self.root != self.null_node:
-            return self._preorder_traversal(self.root, res=[])
+        if self._stats is not None and not self._stats._busy:
+            return self._stats._call('predecessor', type(self).predecessor, self, num)
+        key = self._sort_key(num)
+        node = self.root
+        best = None
+        while node is not self.null_node:
+            if node.key < key:
+                best = node
+                node = node.right
+            else:
+                node = node.left
+        return None if best is None else best.val
 
-    def _preorder_traversal(self, node, res=[]):
+    def successor(self, num):
         """
-        Implementation of preorder traversal printing
-        :param node: node
+        Smallest value strictly larger than num
+        :param num: number
+        :return: value or None
+        """
+        if self._stats is not None and not self._stats._busy:
+            return self._stats._call('successor', type(self).successor, self, num)
+        key = self._sort_key(num)
+        node = self.root
+        best = None
+        while node is not self.null_node:
+            if key < node.key:
+                best = node
+                node = node.left
+            else:
+                node = node.right
+        return None if best is None else best.val
+
+    def __iter__(self):
+        for node in self._inorder_nodes():
+            yield node.val
+
+    def __reversed__(self):
+        for node in self._reverse_nodes():
+            yield node.val
+
+    def irange(self, lo=None, hi=None, inclusive=(True, True), reverse=False):
+        """
+        Lazy range query, only the O(log n) nodes on the search path plus the ones in range are visited
+        :param lo: lower bound, None for unbounded
+        :param hi: upper bound, None for unbounded
+        :param inclusive: pair of booleans telling whether lo and hi themselves are included
+        :param reverse: yield in descending order
+        :return: generator of values between lo and hi
+        """
+        for node in self._irange_nodes(lo, hi, inclusive, reverse):
+            yield node.val
+
+    def _irange_nodes(self, lo, hi, inclusive, reverse):
+        """
+        Implementation of irange
+        :return: generator of nodes between lo and hi
+        """
+        lo_inclusive, hi_inclusive = inclusive
+        lo_key = None if lo is None else self._sort_key(lo)
+        hi_key = None if hi is None else self._sort_key(hi)
+
+        def above_lo(key):
+            return lo is None or (not key < lo_key if lo_inclusive else lo_key < key)
+
+        def below_hi(key):
+            return hi is None or (not hi_key < key if hi_inclusive else key < hi_key)
+
+        if reverse:
+            nodes = self._reverse_nodes(below_hi)
+            in_range = above_lo
+        else:
+            nodes = self._inorder_nodes(above_lo)
+            in_range = below_hi
+        for node in nodes:
+            if not in_range(node.key):
+                return
+            yield node
+
+    def islice(self, start=None, stop=None, reverse=False):
+        """
+        Lazy positional slice of the sorted values, negative positions count from the end
+        :param start: first position, None for the beginning
+        :param stop: position to stop before, None for the end
+        :param reverse: count positions and yield from the largest value down
+        :return: generator of values
+        """
+        start, stop, _ = slice(start, stop).indices(self._size)
+        nodes = self._reverse_nodes() if reverse else self._inorder_nodes()
+        for node in itertools.islice(nodes, start, max(start, stop)):
+            yield node.val
+
+    def _inorder_nodes(self, fits=None):
+        """
+        Iterative inorder walk with an explicit stack, O(log n) extra memory
+        :param fits: optional predicate on sort keys, the walk starts at the first key passing it
+        and assumes every later key passes as well
+        :return: generator of nodes
+        """
+        stack = []
+        node = self.root
+        if fits is not None:
+            # Seek: keep the nodes passing the predicate on the stack, skip right past the others
+            while node is not self.null_node:
+                if fits(node.key):
+                    stack.append(node)
+                    node = node.left
+                else:
+                    node = node.right
+            if not stack:
+                return
+            node = stack.pop()
+            yield node
+            node = node.right
+        while stack or node is not self.null_node:
+            while node is not self.null_node:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node
+            node = node.right
+
+    def _reverse_nodes(self, fits=None):
+        """
+        Mirror image of _inorder_nodes, from the largest value down
+        :param fits: optional predicate on sort keys, the walk starts at the last key passing it
+        and assumes every earlier key passes as well
+        :return: generator of nodes
+        """
+        stack = []
+        node = self.root
+        if fits is not None:
+            while node is not self.null_node:
+                if fits(node.key):
+                    stack.append(node)
+                    node = node.right
+                else:
+                    node = node.left
+            if not stack:
+                return
+            node = stack.pop()
+            yield node
+            node = node.left
+        while stack or node is not self.null_node:
+            while node is not self.null_node:
+                stack.append(node)
+                node = node.right
+            node = stack.pop()
+            yield node
+            node = node.left
+
+    def _preorder_nodes(self):
+        """
+        Iterative preorder walk with an explicit stack
+        :return: generator of nodes
+        """
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node is not self.null_node:
+                yield node
+                stack.append(node.right)
+                stack.append(node.left)
+
+    def _postorder_nodes(self):
+        """
+        Iterative postorder walk, a node is emitted once its right subtree has been emitted
+        :return: generator of nodes
+        """
+        stack = []
+        last = None
+        node = self.root
+        while stack or node is not self.null_node:
+            while node is not self.null_node:
+                stack.append(node)
+                node = node.left
+            top = stack[-1]
+            if top.right is not self.null_node and top.right is not last:
+                node = top.right
+            else:
+                last = stack.pop()
+                yield last
+
+    def inorder_print_tree(self):
+        """
+        Binary Tree inorder presentation
         :return: List of tree values
         """
-        if node is not self.null_node:
-            res.append(node.val)
-            self._preorder_traversal(node.left, res)
-            self._preorder_traversal(node.right, res)
-            return res
+        if self.root != self.null_node:
+            return [node.val for node in self._inorder_nodes()]
 
-    def postorder_print_tree(self):
+    def preorder_print_tree(self):
         """
-        Binary Tree postorder presentation
+        Binary Tree preorder presentation
         :return: List of tree values
         """
         if self.root != self.null_node:
-            return self._postorder_traversal(self.root, res=[])
+            return [node.val for node in self._preorder_nodes()]
 
-    def _postorder_traversal(self, node, res=[]):
+    def postorder_print_tree(self):
         """
-        Implementation of postorder traversal printing
-        :param node: node
+        Binary Tree postorder presentation
         :return: List of tree values
         """
-        if node is not self.null_node:
-            self._postorder_traversal(node.left, res)
-            self._postorder_traversal(node.right, res)
-            res.append(node.val)
-            return res
+        if self.root != self.null_node:
+            return [node.val for node in self._postorder_nodes()]
 
     def graphicalPrintTree(self):
         """
         Graphical Representation of Binary Tree
+        Equal values share one entry, level_order_edges() keeps them apart
         :return: Graphs with format {parent: [child, child...]}
         """
         graph = collections.defaultdict(list)
-        if self.root != self.null_node:
-            stack = [self.root]
-            # Graph generation into format {parent: [child, child...]}
-            while stack:
-                curr = stack.pop(0)
-                for child in [curr.left, curr.right]:
-                    if child != self.null_node:
-                        if child.color == 0:
-                            color = 'Black'
-                        else:
-                            color = 'Red'
-                        graph[curr.val].append((child.val, color))
-                        stack.append(child)
+        # Graph generation into format {parent: [child, child...]}
+        for parent, _, child, _, _ in self._level_order():
+            if parent is not None:
+                graph[parent.val].append((child.val, 'Black' if child.color == 0 else 'Red'))
         return graph
 
+    def level_order_edges(self):
+        """
+        Streaming level-order export in O(n), nothing is collected besides the queue of one level
+        :return: generator of (parent value, child value, 'Black' or 'Red', depth), the root comes first
+                 with parent None and depth 0
+        """
+        for parent, _, child, _, depth in self._level_order():
+            yield None if parent is None else parent.val, child.val, 'Black' if child.color == 0 else 'Red', depth
+
+    def write_dot(self, path):
+        """
+        Write the tree as a Graphviz digraph, one line per node and per edge as they are reached
+        Nodes are numbered in level order, so equal values stay separate nodes
+        :param path: output file
+        :return: number of nodes written
+        """
+        count = 0
+        with open(path, 'w') as handle:
+            handle.write('digraph RedBlackTree {\n    node [style=filled, fontcolor=white];\n')
+            for parent, parent_id, child, child_id, _ in self._level_order():
+                handle.write('    n{} [label={}, fillcolor={}];\n'.format(
+                    child_id, json.dumps(str(child.val)), 'black' if child.color == 0 else 'red'))
+                if parent is not None:
+                    handle.write('    n{} -> n{};\n'.format(parent_id, child_id))
+                count += 1
+            handle.write('}\n')
+        return count
+
+    def write_jsonl(self, path):
+        """
+        Write the tree as JSON lines, one record per node as it is reached in level order
+        Records are {"id", "parent_id", "parent", "child", "color", "depth"}, ids are level-order
+        numbers and values that JSON cannot hold are written as strings
+        :param path: output file
+        :return: number of records written
+        """
+        encoder = json.JSONEncoder(default=str).encode
+
+        def encode(val):
+            # Plain integers, by far the most common values, skip the encoder
+            return str(val) if type(val) is int else encoder(val)
+
+        line = '{{"id": {}, "parent_id": {}, "parent": {}, "child": {}, "color": "{}", "depth": {}}}\n'
+        count = 0
+        with open(path, 'w') as handle:
+            for parent, parent_id, child, child_id, depth in self._level_order():
+                # Only the values need encoding, the rest is numbers
+                if parent is None:
+                    parent_id = parent_value = 'null'
+                else:
+                    parent_value = encode(parent.val)
+                handle.write(line.format(child_id, parent_id, parent_value, encode(child.val),
+                                         'Black' if child.color == 0 else 'Red', depth))
+                count += 1
+        return count
+
+    def _level_order(self):
+        """
+        Breadth-first walk over the nodes, a deque makes each step O(1)
+        :return: generator of (parent node, parent number, node, node number, depth), numbers count nodes
+                 in level order from 0 at the root, whose parent and parent number are None
+        """
+        if self.root is self.null_node:
+            return
+        yield None, None, self.root, 0, 0
+        # Only nodes are queued, they leave in the order they were numbered and each level
+        # ends where the numbering stood when its first node left
+        queue = collections.deque([self.root])
+        count = 1
+        number = 0
+        depth = 0
+        level_end = 1
+        while queue:
+            node = queue.popleft()
+            if number == level_end:
+                depth += 1
+                level_end = count
+            for child in (node.left, node.right):
+                if child is not self.null_node:
+                    yield node, number, child, count, depth + 1
+                    queue.append(child)
+                    count += 1
+            number += 1
+
+
+class AugmentedRedBlackTree(RedBlackBinaryTree):
+    """
+    Base of the trees keeping a summary in each node that is recomputed from the node and its
+    two children, like the largest end of IntervalTree or the reduction of AggregateTree
+    Linking, removal, rebuilds and rotations keep the summaries up to date, so subclasses only
+    implement _refresh
+    """
+    _augmented = True
+
+    def _link(self, node, parent):
+        super(AugmentedRedBlackTree, self)._link(node, parent)
+        self._update_path(node)
+
+    def _delete_node(self, curr):
+        # Summaries above the node physically leaving its position change
+        if curr.left is self.null_node or curr.right is self.null_node:
+            start = curr.parent
+        else:
+            start = self._minVal(curr.right)
+            if start.parent is not curr:
+                start = start.parent
+        super(AugmentedRedBlackTree, self)._delete_node(curr)
+        # Rotations during the rebalance keep stale nodes above start, refresh them all at once
+        self._update_path(start)
+
+    def _relink(self, nodes):
+        root = super(AugmentedRedBlackTree, self)._relink(nodes)
+
+        def refresh(lo, hi):
+            if lo >= hi:
+                return
+            mid = (lo + hi) // 2
+            refresh(lo, mid)
+            refresh(mid + 1, hi)
+            self._refresh(nodes[mid])
+
+        refresh(0, len(nodes))
+        return root
+
+    def left_rotate(self, node):
+        tmp = node.right
+        super(AugmentedRedBlackTree, self).left_rotate(node)
+        self._refresh(node)
+        self._refresh(tmp)
+
+    def right_rotate(self, node):
+        tmp = node.left
+        super(AugmentedRedBlackTree, self).right_rotate(node)
+        self._refresh(node)
+        self._refresh(tmp)
+
+
+class Cursor:
+    """
+    Position on a node of a tree, moves and searches start from there instead of the root
+    next() and prev() take O(1) amortized, seek() climbs through the parent pointers only until
+    the target falls inside the subtree below and searches down that subtree alone, so a key at
+    distance d is found in O(log d) amortized
+    A cursor past the largest value is off the tree: next() stays there and prev() comes back
+    Removing the node under a cursor other than through delete_here() leaves that cursor dangling
+    """
+
+    def __init__(self, tree, node):
+        self._tree = tree
+        # Node under the cursor, None when off the tree
+        self._node = node
+
+    def __bool__(self):
+        return self._node is not None
+
+    def current(self):
+        """
+        Value under the cursor
+        :return: value, None when off the tree
+        """
+        return None if self._node is None else self._node.val
+
+    def next(self):
+        """
+        Move to the next value
+        :return: the new value, None when the cursor went off the tree
+        """
+        if self._node is not None:
+            self._node = self._tree._successor(self._node)
+        return self.current()
+
+    def prev(self):
+        """
+        Move to the previous value, from off the tree to the largest one
+        :return: the new value, None when there is no previous value, the cursor then stays put
+        """
+        tree = self._tree
+        if self._node is None:
+            if tree.root is not tree.null_node:
+                self._node = tree._maxVal(tree.root)
+        else:
+            node = tree._predecessor(self._node)
+            if node is None:
+                return None
+            self._node = node
+        return self.current()
+
+    def seek(self, num):
+        """
+        Move to the smallest value >= num, searching from the current node
+        :param num: number
+        :return: the new value, None when every value is smaller and the cursor went off the tree
+        """
+        tree = self._tree
+        null_node = tree.null_node
+        key = num if tree.key is None else tree.key(num)
+        node = tree.root if self._node is None else self._node
+        if node is null_node:
+            return None
+        # Climb from one bounding ancestor to the next, skipping the spines between them, and
+        # search down only the subtree between the last two, so no node is visited twice
+        if node.key < key:
+            best = None
+            while True:
+                up = node
+                while up.parent is not None and up is up.parent.right:
+                    up = up.parent
+                if up.parent is None or not up.parent.key < key:
+                    best = up.parent
+                    node = node.right
+                    break
+                node = up.parent
+        else:
+            best = node
+            while True:
+                up = node
+                while up.parent is not None and up is up.parent.left:
+                    up = up.parent
+                if up.parent is None or up.parent.key < key:
+                    node = node.left
+                    break
+                node = best = up.parent
+        while node is not null_node:
+            if node.key < key:
+                node = node.right
+            else:
+                best = node
+                node = node.left
+        self._node = best
+        return self.current()
+
+    def insert_here(self, num):
+        """
+        Insert num searching from the cursor, which then moves onto the new value
+        Only the search is shortened, creating, linking and rebalancing the node cost as much as insert()
+        :param num: number, best close to the current value
+        :return: None
+        """
+        tree = self._tree
+        self._node = tree._insert_node(tree._new_leaf(num), self._node)
+
+    def delete_here(self):
+        """
+        Remove the value under the cursor, which then moves onto the next value
+        :return: the removed value
+        """
+        if self._node is None:
+            raise IndexError("Cursor is off the tree")
+        node = self._node
+        # Rebalancing moves values between positions but never frees the successor's node
+        self._node = self._tree._successor(node)
+        self._tree._delete_node(node)
+        return node.val
+
 
 def main():
     rb_test_tree = RedBlackBinaryTree()
@@ -467,6 +2174,9 @@ def main():
     print(rb_test_tree.postorder_print_tree())
     print("\nGraphical Representation: ")
     print(rb_test_tree.graphicalPrintTree())
+    print("\nCursor: ")
+    cursor = rb_test_tree.cursor(36)
+    print(cursor.current(), cursor.next(), cursor.prev(), cursor.prev())
 
 
 if __name__ == '__main__':
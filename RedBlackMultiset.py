@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+@author: Michael Lin
+"""
+import itertools
+import operator
+
+from RedBlackBinaryTree.RedBlackBinaryTree import Node, RedBlackBinaryTree, _refused
+
+
+class CountedNode(Node):
+    __slots__ = ('count',)
+
+    def __init__(self, val):
+        super(CountedNode, self).__init__(val)
+        # Number of copies of val held by the multiset
+        self.count = 1
+
+
+class RedBlackMultiset(RedBlackBinaryTree):
+    """
+    Red black tree keeping one node per distinct key with a count of its copies
+    Memory and search depth grow with the number of distinct keys, not the number of insertions
+    len() counts copies, iteration repeats each value count times without materializing the copies
+    """
+    _node_class = CountedNode
+
+    def __init__(self, key=None):
+        super(RedBlackMultiset, self).__init__(key)
+        # Copies held, self._size stays the number of nodes
+        self._total = 0
+
+    @classmethod
+    def from_sorted(cls, iterable, key=None):
+        tree = cls(key=key)
+        nodes = [tree._new_leaf(num) for num in iterable]
+        for i in range(1, len(nodes)):
+            if nodes[i].key < nodes[i - 1].key:
+                raise ValueError("Input is not sorted at position {}".format(i))
+        tree._insert_nodes(tree._collapse(nodes))
+        return tree
+
+    @classmethod
+    def from_iterable(cls, iterable, key=None):
+        tree = cls(key=key)
+        tree.insert_many(iterable)
+        return tree
+
+    def __len__(self):
+        return self._total
+
+    def __iter__(self):
+        for node in self._inorder_nodes():
+            yield from itertools.repeat(node.val, node.count)
+
+    def __reversed__(self):
+        for node in self._reverse_nodes():
+            yield from itertools.repeat(node.val, node.count)
+
+    def add(self, num, n=1):
+        """
+        Add copies of num
+        :param num: number
+        :param n: number of copies
+        :return: None
+        """
+        if n < 1:
+            raise ValueError("Number of copies must be positive")
+        key = self._sort_key(num)
+        node = self._find_key(key)
+        if node is None:
+            node = self._new_leaf(num, key)
+            node.count = n
+            self._insert_node(node)
+        else:
+            node.count += n
+            self._total += n
+
+    def discard(self, num, n=1):
+        """
+        Remove up to n copies of num, the node goes when its last copy does
+        :param num: number
+        :param n: number of copies
+        :return: number of copies removed, 0 if num is not in the multiset
+        """
+        if n < 1:
+            raise ValueError("Number of copies must be positive")
+        node = self._find_node(num)
+        if node is None:
+            return 0
+        if node.count > n:
+            node.count -= n
+            self._total -= n
+            return n
+        removed = node.count
+        self._delete_node(node)
+        return removed
+
+    def count(self, num):
+        """
+        Multiplicity of num
+        :param num: number
+        :return: number of copies, 0 if num is not in the multiset
+        """
+        node = self._find_node(num)
+        return 0 if node is None else node.count
+
+    def distinct(self):
+        """
+        Number of distinct keys, which is the number of nodes
+        :return: count
+        """
+        return self._size
+
+    def insert(self, num):
+        self.add(num)
+
+    def insert_many(self, keys):
+        """
+        Batch insertion, equal keys of the batch are counted together before touching the tree
+        :param keys: iterable of numbers
+        :return: None
+        """
+        new_nodes = [self._new_leaf(num) for num in keys]
+        new_nodes.sort(key=operator.attrgetter('key'))
+        fresh = []
+        for node in self._collapse(new_nodes):
+            existing = self._find_key(node.key)
+            if existing is None:
+                fresh.append(node)
+            else:
+                existing.count += node.count
+                self._total += node.count
+        self._insert_nodes(fresh)
+
+    def delete(self, node, num):
+        """
+        Removal of one copy
+        :param node: unused, the search starts from the root
+        :param num: number to be removed
+        :return: None
+        """
+        if not self.discard(num):
+            print("Node not found")
+
+    def delete_many(self, keys):
+        """
+        Batch removal, each key removes one copy
+        :param keys: iterable of numbers, those not in the multiset are ignored
+        :return: number of copies removed
+        """
+        return sum(self.discard(num) for num in keys)
+
+    def irange(self, lo=None, hi=None, inclusive=(True, True), reverse=False):
+        for node in self._irange_nodes(lo, hi, inclusive, reverse):
+            yield from itertools.repeat(node.val, node.count)
+
+    def islice(self, start=None, stop=None, reverse=False):
+        start, stop, _ = slice(start, stop).indices(self._total)
+        values = reversed(self) if reverse else iter(self)
+        return itertools.islice(values, start, max(start, stop))
+
+    # Counts per node have no place in the dump format or in set algebra, and a cursor insertion would bypass them
+    dump = load = join = split = cursor = _merge_operation = _set_operation = _refused(
+        "RedBlackMultiset keeps counts per node and does not support dump, load, join, split, cursor "
+        "or set operations")
+
+    def _collapse(self, nodes):
+        """
+        Merge runs of equal keys into their first node
+        :param nodes: nodes sorted by key
+        :return: list of nodes with distinct keys, counts added up
+        """
+        distinct = []
+        for node in nodes:
+            if distinct and not distinct[-1].key < node.key:
+                distinct[-1].count += node.count
+            else:
+                distinct.append(node)
+        return distinct
+
+    def _link(self, node, parent):
+        super(RedBlackMultiset, self)._link(node, parent)
+        self._total += node.count
+
+    def _delete_node(self, curr):
+        self._total -= curr.count
+        super(RedBlackMultiset, self)._delete_node(curr)
+
+    def _relink(self, nodes):
+        # Only used to rebuild the whole tree, so the total follows the nodes
+        self._total = sum(node.count for node in nodes)
+        return super(RedBlackMultiset, self)._relink(nodes)
+
+
+def main():
+    ms_test_tree = RedBlackMultiset.from_iterable([55, 40, 55, 30, 40, 55])
+    print(list(ms_test_tree))
+    print("Count of 55: {}, size {}, distinct {}".format(ms_test_tree.count(55), len(ms_test_tree),
+                                                          ms_test_tree.distinct()))
+    ms_test_tree.discard(55, 2)
+    ms_test_tree.add(30, 3)
+    print(list(ms_test_tree.irange(30, 50)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+@author: Michael Lin
+"""
+import threading
+
+from RedBlackBinaryTree.BoundedRedBlackTree import BoundedRedBlackTree
+
+
+class QueueHandle:
+    """
+    Handle of a queued entry, returned by push
+    queued stays True until the entry is popped or cancelled
+    """
+    __slots__ = ('queued', '_node', '_item')
+
+    def __init__(self, node, item):
+        self.queued = True
+        self._node = node
+        self._item = item
+
+
+class TreePriorityQueue:
+    """
+    Thread-safe priority queue on a red black tree, e.g. a timer queue keyed by deadline
+    Unlike a binary heap, entries leave the tree the moment they are cancelled or reprioritized,
+    so workloads dominated by cancellations and updates never pile up stale entries
+    Equal priorities come out in push order, an updated entry counting as pushed at the update.
+    push returns a QueueHandle for update_priority and cancel
+    """
+
+    def __init__(self):
+        super(TreePriorityQueue, self).__init__()
+        # Unbounded, only used for its cached minimum
+        self._tree = BoundedRedBlackTree()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._tree)
+
+    def push(self, priority, item=None):
+        """
+        Add an entry
+        :param priority: comparable priority, smallest first
+        :param item: payload
+        :return: handle of the entry
+        """
+        with self._lock:
+            node = self._tree._new_leaf(priority)
+            node.value = handle = QueueHandle(node, item)
+            self._tree._insert_node(node)
+            return handle
+
+    def peek_min(self):
+        """
+        Entry with the smallest priority, O(1) from the cached minimum
+        :return: (priority, item), IndexError if the queue is empty
+        """
+        with self._lock:
+            node = self._tree._min_node
+            if node is None:
+                raise IndexError("peek at an empty queue")
+            return node.val, node.value._item
+
+    def pop_min(self):
+        """
+        Remove the entry with the smallest priority, amortized O(1)
+        :return: (priority, item), IndexError if the queue is empty
+        """
+        with self._lock:
+            node = self._tree._min_node
+            if node is None:
+                raise IndexError("pop from an empty queue")
+            self._remove(node)
+            return node.val, node.value._item
+
+    def pop_due(self, now):
+        """
+        Drain every entry whose priority is <= now in one pass from the minimum, O(k) amortized for k entries
+        :param now: current time, or any priority bound
+        :return: list of (priority, item) in priority order
+        """
+        due = []
+        with self._lock:
+            node = self._tree._min_node
+            while node is not None and not now < node.key:
+                self._remove(node)
+                due.append((node.val, node.value._item))
+                node = self._tree._min_node
+        return due
+
+    def update_priority(self, handle, priority):
+        """
+        Change the priority of a queued entry, the decrease-key / increase-key operation
+        The entry is changed in place if it keeps its position, else moved in O(log n)
+        :param handle: handle returned by push
+        :param priority: new priority
+        :return: None, KeyError if the entry already left the queue
+        """
+        with self._lock:
+            tree = self._tree
+            if not handle.queued:
+                raise KeyError("Entry is no longer queued")
+            node = handle._node
+            before = tree._predecessor(node)
+            after = tree._successor(node)
+            # A moved entry goes after every equal priority, so it may only stay put if none follows it
+            if (before is None or not priority < before.key) and (after is None or priority < after.key):
+                node.val = node.key = priority
+                return
+            tree._delete_node(node)
+            # Same node back in as a fresh leaf, so the handle stays valid
+            node.val = node.key = priority
+            node.parent = None
+            node.left = node.right = tree.null_node
+            node.color = 1
+            tree._insert_node(node)
+
+    def cancel(self, handle):
+        """
+        Remove an entry before it is due
+        :param handle: handle returned by push
+        :return: True if the entry was still queued
+        """
+        with self._lock:
+            if not handle.queued:
+                return False
+            self._remove(handle._node)
+            return True
+
+    def _remove(self, node):
+        """
+        Take a node out of the tree and mark its handle as gone
+        :param node: queued node
+        :return: None
+        """
+        self._tree._delete_node(node)
+        node.value.queued = False
+
+
+def main():
+    pq_test_queue = TreePriorityQueue()
+    for deadline, job in [(5.0, 'flush'), (1.0, 'ping'), (3.0, 'compact'), (9.0, 'report')]:
+        handle = pq_test_queue.push(deadline, job)
+    pq_test_queue.update_priority(handle, 2.0)
+    print(pq_test_queue.peek_min())
+    print(pq_test_queue.pop_due(4.0))
+    print(pq_test_queue.pop_min(), len(pq_test_queue))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+@author: Michael Lin
+"""
+import time
+
+from RedBlackBinaryTree.RedBlackBinaryTree import RedBlackBinaryTree
+
+# Public operations whose search path is walked again to count it, the others are counted
+# where they link, remove or rotate nodes
+_SEARCHES = ('find', 'floor', 'ceiling')
+# Public operations always walking down to a leaf, with whether they go right on an equal key
+_DESCENTS = {'predecessor': False, 'successor': True}
+# Latency buckets are powers of two nanoseconds, bucket b holds durations below 2 ** b ns
+_BUCKETS = 64
+
+
+class OperationStats:
+    """
+    Calls, nodes visited and latency histogram of one public operation
+    """
+    __slots__ = ('calls', 'nodes_visited', 'total_ns', 'buckets')
+
+    def __init__(self):
+        self.calls = 0
+        self.nodes_visited = 0
+        self.total_ns = 0
+        self.buckets = [0] * _BUCKETS
+
+
+class TreeStats:
+    """
+    Counters filled by a tree after enable_stats()
+    The tree calls in from hooks in its rotations, rebalances, _link and _delete_node, so
+    rotations, recolors and rebalance_iterations are exact, recolors being the color changes made
+    by the rebalances (a successor taking the color of the node it replaces is not one)
+    nodes_visited and comparisons count the path down to each linked or removed node, and the
+    path of find, floor, ceiling, predecessor and successor, which is walked a second time for it
+    Subclasses that replace one of these steps, like the path copying of PersistentRedBlackTree,
+    or a public operation without calling the base method, are not counted there
+    """
+
+    def __init__(self):
+        # Slow operation callbacks as (threshold in nanoseconds, callback)
+        self._slow = []
+        # Set while a timed operation runs, so that the operations it calls are not recorded again
+        self._busy = False
+        self.reset()
+
+    def reset(self):
+        """
+        Zero every counter and histogram, slow operation callbacks are kept
+        :return: None
+        """
+        self.comparisons = 0
+        self.nodes_visited = 0
+        self.rotations = 0
+        self.recolors = 0
+        self.rebalance_iterations = 0
+        self.operations = {}
+
+    def on_slow(self, seconds, callback):
+        """
+        Register a callback for operations slower than a threshold
+        :param seconds: threshold
+        :param callback: called as callback(operation name, seconds taken, arguments of the call)
+        :return: None
+        """
+        self._slow.append((int(seconds * 1e9), callback))
+
+    def percentile(self, operation, q):
+        """
+        Latency percentile read from the histogram, so only accurate to a factor of two
+        :param operation: name of a timed operation, e.g. 'insert'
+        :param q: percentile between 0 and 100
+        :return: upper bound of the bucket holding the percentile in seconds, None if never called
+        """
+        op = self.operations.get(operation)
+        if op is None:
+            return None
+        rank = q / 100 * op.calls
+        seen = 0
+        for b, count in enumerate(op.buckets):
+            seen += count
+            if count and seen >= rank:
+                return (1 << b) / 1e9
+        return None
+
+    def histogram(self, operation):
+        """
+        Non-empty buckets of the latency histogram of an operation
+        :param operation: name of a timed operation
+        :return: list of (upper bound in seconds, number of calls)
+        """
+        op = self.operations.get(operation)
+        if op is None:
+            return []
+        return [((1 << b) / 1e9, count) for b, count in enumerate(op.buckets) if count]
+
+    def summary(self):
+        """
+        Counters and per operation averages as plain values
+        :return: dictionary
+        """
+        result = {
+            'comparisons': self.comparisons,
+            'nodes_visited': self.nodes_visited,
+            'rotations': self.rotations,
+            'recolors': self.recolors,
+            'rebalance_iterations': self.rebalance_iterations,
+        }
+        for name, op in self.operations.items():
+            result[name] = {
+                'calls': op.calls,
+                'nodes_visited/op': op.nodes_visited / op.calls,
+                'mean_seconds': op.total_ns / op.calls / 1e9,
+                'p99_seconds': self.percentile(name, 99),
+            }
+        return result
+
+    def _call(self, operation, method, tree, *args):
+        """
+        Run a public operation of the tree and record it, the operations it calls are not recorded
+        :param operation: operation name
+        :param method: the operation as a function, called as method(tree, *args)
+        :param tree: tree the stats belong to
+        :param args: arguments of the call
+        :return: result of the operation
+        """
+        self._busy = True
+        visited = self.nodes_visited
+        if operation in _SEARCHES:
+            self._count_search(tree, args[0])
+        elif operation in _DESCENTS:
+            self._count_descent(tree, args[0], _DESCENTS[operation])
+        start = time.perf_counter_ns()
+        try:
+            return method(tree, *args)
+        finally:
+            elapsed = time.perf_counter_ns() - start
+            self._busy = False
+            self._record(operation, elapsed, self.nodes_visited - visited, args)
+
+    def _count_search(self, tree, num):
+        """
+        Count the path of a search from the root, stopping at an equal key
+        :param tree: tree searched
+        :param num: number searched for
+        :return: None
+        """
+        key = tree._sort_key(num)
+        node = tree.root
+        while node is not tree.null_node:
+            self.nodes_visited += 1
+            self.comparisons += 1
+            if key < node.key:
+                node = node.left
+                continue
+            self.comparisons += 1
+            if node.key < key:
+                node = node.right
+            else:
+                break
+
+    def _count_descent(self, tree, num, right_on_equal):
+        """
+        Count the path of a search from the root down to a leaf, one comparison per level
+        :param tree: tree searched
+        :param num: number searched for
+        :param right_on_equal: whether the search goes right on an equal key
+        :return: None
+        """
+        key = tree._sort_key(num)
+        node = tree.root
+        while node is not tree.null_node:
+            self.nodes_visited += 1
+            self.comparisons += 1
+            if key < node.key or (not right_on_equal and not node.key < key):
+                node = node.left
+            else:
+                node = node.right
+
+    def _count_path(self, node):
+        """
+        Count the path from the root down to a node, one comparison per level
+        :param node: node of the tree, None for an empty path
+        :return: None
+        """
+        while node is not None:
+            self.nodes_visited += 1
+            self.comparisons += 1
+            node = node.parent
+
+    def _record(self, operation, elapsed, visited, args):
+        op = self.operations.get(operation)
+        if op is None:
+            op = self.operations[operation] = OperationStats()
+        op.calls += 1
+        op.nodes_visited += visited
+        op.total_ns += elapsed
+        op.buckets[min(elapsed.bit_length(), _BUCKETS - 1)] += 1
+        for threshold, callback in self._slow:
+            if elapsed >= threshold:
+                callback(operation, elapsed / 1e9, args)
+
+
+def main():
+    st_test_tree = RedBlackBinaryTree()
+    stats = st_test_tree.enable_stats()
+    stats.on_slow(0.001, lambda name, seconds, args: print("Slow {} {:.4f}s".format(name, seconds)))
+    st_test_tree.insert_many([55, 40, 65, 60, 75, 57])
+    for num in [30, 35, 70, 80, 85]:
+        st_test_tree.insert(num)
+    st_test_tree.find(57)
+    st_test_tree.delete(st_test_tree.root, 40)
+    print(stats.summary())
+    st_test_tree.disable_stats()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+@author: Michael Lin
+"""
+import os
+import random
+import tempfile
+
+import pytest
+
+from RedBlackBinaryTree.BoundedRedBlackTree import BoundedRedBlackTree
+
+
+def lru_tree():
+    tree = BoundedRedBlackTree(5, 'lru')
+    for num in [50, 20, 80, 10, 60]:
+        tree.insert(num)
+    # 20 becomes the most recently accessed value
+    assert 20 in tree
+    return tree
+
+
+def eviction_order(tree):
+    evicted = []
+    tree.on_evict = lambda num, value: evicted.append(num)
+    tree.max_size = 0
+    tree._trim()
+    return evicted
+
+
+REFUSED = [
+    lambda tree: tree.cursor(20),
+    lambda tree: tree.dump(os.path.join(tempfile.gettempdir(), 'bounded.rbt')),
+    lambda tree: BoundedRedBlackTree.load(os.path.join(tempfile.gettempdir(), 'bounded.rbt')),
+    lambda tree: tree.union(BoundedRedBlackTree.from_iterable([1, 99], policy='lru')),
+    lambda tree: tree.intersection(BoundedRedBlackTree.from_iterable([1, 99], policy='lru')),
+    lambda tree: tree.difference(BoundedRedBlackTree.from_iterable([1, 99], policy='lru')),
+    lambda tree: tree.symmetric_difference(BoundedRedBlackTree.from_iterable([1, 99], policy='lru')),
+]
+
+
+@pytest.mark.parametrize('call', REFUSED)
+def test_refused_call_leaves_tree_unchanged(call):
+    tree = lru_tree()
+    with pytest.raises(TypeError, match='BoundedRedBlackTree'):
+        call(tree)
+    assert list(tree) == [10, 20, 50, 60, 80]
+    assert (tree.min(), tree.max()) == (10, 80)
+    tree.validate()
+    assert eviction_order(tree) == [50, 80, 10, 60, 20]
+
+
+def test_split_keeps_bound_extremes_and_access_order():
+    tree = lru_tree()
+    left, right = tree.split(55)
+    assert list(left) == [10, 20, 50] and list(right) == [60, 80]
+    assert (left.min(), left.max(), right.min(), right.max()) == (10, 50, 60, 80)
+    assert left.max_size == right.max_size == 5 and left.policy == right.policy == 'lru'
+    assert len(tree) == 0
+    left.validate()
+    right.validate()
+    assert eviction_order(left) == [50, 10, 20]
+    assert eviction_order(right) == [80, 60]
+
+
+@pytest.mark.parametrize('policy', ['min', 'max', 'lru'])
+def test_join_trims_to_the_bound(policy):
+    rng = random.Random(3)
+    keys = rng.sample(range(1000), 60)
+    small = sorted(k for k in keys if k < 500)
+    large = sorted(k for k in keys if k >= 500)
+    left = BoundedRedBlackTree.from_iterable(small, max_size=40, policy=policy)
+    right = BoundedRedBlackTree.from_iterable(large, max_size=100, policy=policy)
+    left_values, right_values = list(left), list(right)
+    tree = BoundedRedBlackTree.join(left, 500, right)
+    values = sorted(left_values + [500] + right_values)
+    if policy == 'min':
+        values = values[-40:]
+    elif policy == 'max':
+        values = values[:40]
+    else:
+        kept = set((left_values + right_values + [500])[-40:])
+        values = [num for num in values if num in kept]
+    assert list(tree) == values
+    assert len(tree) == 40
+    assert (tree.min(), tree.max()) == (values[0], values[-1])
+    tree.validate()
+    tree.insert(-1)
+    assert len(tree) == 40
@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+@author: Michael Lin
+"""
+import pytest
+
+from RedBlackBinaryTree.RedBlackBinaryTree import RedBlackBinaryTree
+
+
+def test_lists_give_lists():
+    tree = RedBlackBinaryTree.from_iterable([1, 5, 9])
+    assert tree.contains_many([9, 2, 1, 9]) == [True, False, True, True]
+
+
+@pytest.mark.parametrize('key', [None, abs])
+def test_arrays_give_boolean_arrays(key):
+    np = pytest.importorskip('numpy')
+    tree = RedBlackBinaryTree.from_iterable([1, 5, 9], key=key)
+    found = tree.contains_many(np.array([9, 2, 1, 9]))
+    assert isinstance(found, np.ndarray) and found.dtype == bool
+    assert found.tolist() == [True, False, True, True]
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+@author: Michael Lin
+"""
+import gc
+import os
+import warnings
+
+import pytest
+
+from RedBlackBinaryTree.MappedRedBlackTree import MappedRedBlackTree
+from RedBlackBinaryTree.RedBlackBinaryTree import RedBlackBinaryTree
+
+
+def dumped(tmp_path):
+    path = str(tmp_path / 'tree.rbt')
+    RedBlackBinaryTree.from_iterable([5, 1, 9, 3]).dump(path)
+    with open(path, 'rb') as handle:
+        return path, handle.read()
+
+
+def corruptions(data):
+    return {'short': data[:10],
+            'bad magic': b'XXXX' + data[4:],
+            'bad key typecode': data[:4] + b'z' + data[5:],
+            'bad size typecode': data[:5] + b'b' + data[6:],
+            'truncated': data[:-1]}
+
+
+def test_round_trip(tmp_path):
+    path, _ = dumped(tmp_path)
+    assert list(RedBlackBinaryTree.load(path)) == [1, 3, 5, 9]
+    with MappedRedBlackTree(path) as mapped:
+        assert len(mapped) == 4 and 9 in mapped and 4 not in mapped
+
+
+@pytest.mark.parametrize('reader', [RedBlackBinaryTree.load, MappedRedBlackTree])
+def test_bad_files_raise_value_error(tmp_path, reader):
+    _, data = dumped(tmp_path)
+    for name, content in corruptions(data).items():
+        path = str(tmp_path / name)
+        with open(path, 'wb') as handle:
+            handle.write(content)
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', ResourceWarning)
+            with pytest.raises(ValueError):
+                reader(path)
+            gc.collect()
+        # Nothing keeps the file open
+        os.remove(path)
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+@author: Michael Lin
+"""
+import os
+import tempfile
+
+import pytest
+
+from RedBlackBinaryTree.RedBlackMultiset import RedBlackMultiset
+
+REFUSED = [
+    lambda tree: tree.dump(os.path.join(tempfile.gettempdir(), 'multiset.rbt')),
+    lambda tree: RedBlackMultiset.load(os.path.join(tempfile.gettempdir(), 'multiset.rbt')),
+    lambda tree: RedBlackMultiset.join(tree, 10, RedBlackMultiset()),
+    lambda tree: tree.split(3),
+    lambda tree: tree.cursor(3),
+    lambda tree: tree.union(RedBlackMultiset.from_iterable([1, 9])),
+    lambda tree: tree.intersection(RedBlackMultiset.from_iterable([1, 9])),
+    lambda tree: tree.difference(RedBlackMultiset.from_iterable([1, 9])),
+    lambda tree: tree.symmetric_difference(RedBlackMultiset.from_iterable([1, 9])),
+]
+
+
+@pytest.mark.parametrize('call', REFUSED)
+def test_unsupported_operations_raise_type_error(call):
+    tree = RedBlackMultiset.from_iterable([1, 3, 3, 5])
+    with pytest.raises(TypeError, match='RedBlackMultiset'):
+        call(tree)
+    assert list(tree) == [1, 3, 3, 5]
+    assert tree.count(3) == 2
+    tree.validate()
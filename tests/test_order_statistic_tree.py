@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+@author: Michael Lin
+"""
+import pytest
+
+from RedBlackBinaryTree.OrderStatisticTree import OrderStatisticTree
+
+
+def test_positions_must_be_integers():
+    tree = OrderStatisticTree.from_iterable(range(10))
+    with pytest.raises(TypeError):
+        tree[2.5]
+    with pytest.raises(TypeError):
+        del tree[2.5]
+    with pytest.raises(TypeError):
+        tree.select(2.5)
+    with pytest.raises(TypeError):
+        tree[2] = 5
+    assert list(tree) == list(range(10))
+    assert tree[True] == 1
+    assert tree[-1] == 9
+    del tree[-1]
+    assert list(tree) == list(range(9))
+    tree.validate()
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+@author: Michael Lin
+"""
+import random
+
+import pytest
+
+from RedBlackBinaryTree.PersistentRedBlackTree import PersistentRedBlackTree
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_split_and_join_leave_snapshots_intact(seed):
+    rng = random.Random(seed)
+    keys = rng.sample(range(2000), rng.choice([0, 1, 5, 300]))
+    tree = PersistentRedBlackTree.from_iterable(keys)
+    tree.insert(2500)
+    snap = tree.snapshot()
+    values = list(tree)
+    pivot = rng.randrange(2600)
+    left, right = tree.split(pivot)
+    assert list(left) == [k for k in values if k < pivot]
+    assert list(right) == [k for k in values if k >= pivot]
+    left_snap = left.snapshot()
+    left.insert(-1)
+    joined = PersistentRedBlackTree.join(left, pivot, right)
+    assert list(joined) == [-1] + sorted(values + [pivot])
+    assert len(joined) == len(values) + 2
+    joined.delete(joined.root, pivot)
+    for tree in (joined, snap, left_snap):
+        tree.validate()
+    assert list(snap) == values
+    assert list(left_snap) == [k for k in values if k < pivot]
+
+
+def test_cursors_and_set_operations_raise_type_error():
+    tree = PersistentRedBlackTree.from_iterable([1, 2, 3])
+    with pytest.raises(TypeError, match='PersistentRedBlackTree'):
+        tree.cursor(2)
+    with pytest.raises(TypeError, match='PersistentRedBlackTree'):
+        tree.union(PersistentRedBlackTree.from_iterable([4]))
+    assert list(tree) == [1, 2, 3]
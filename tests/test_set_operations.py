@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+@author: Michael Lin
+"""
+import random
+
+import pytest
+
+from RedBlackBinaryTree.OrderStatisticTree import OrderStatisticTree
+from RedBlackBinaryTree.RedBlackBinaryTree import RedBlackBinaryTree
+
+
+def first(pair):
+    return pair[0]
+
+
+@pytest.mark.parametrize('mine, theirs', [(1000, 1000), (1000, 20), (20, 1000), (5000, 1), (1, 5000)])
+def test_union_keeps_own_value_for_shared_keys(mine, theirs):
+    # The sizes cover the linear merge, the leaf insertions and the recursive split and join
+    rng = random.Random(mine * 31 + theirs)
+    own_keys = rng.sample(range(10 * (mine + theirs)), mine)
+    shared = min(mine, theirs) // 2
+    other_keys = rng.sample(own_keys, shared) + rng.sample(range(-theirs, 0), theirs - shared)
+    tree = RedBlackBinaryTree.from_iterable([(k, 'self') for k in own_keys], key=first)
+    other = RedBlackBinaryTree.from_iterable([(k, 'other') for k in other_keys], key=first)
+    tree.union(other)
+    expected = dict((k, 'other') for k in other_keys)
+    expected.update((k, 'self') for k in own_keys)
+    assert list(tree) == sorted(expected.items())
+    assert len(tree) == len(expected)
+    assert len(other) == 0
+    tree.validate()
+
+
+@pytest.mark.parametrize('cls', [RedBlackBinaryTree, OrderStatisticTree])
+def test_split_and_join_sizes(cls):
+    rng = random.Random(7)
+    keys = rng.sample(range(10000), 2000)
+    tree = cls.from_iterable(keys)
+    left, right = tree.split(5000)
+    assert len(left) == sum(1 for k in keys if k < 5000)
+    assert len(right) == sum(1 for k in keys if k >= 5000)
+    left.insert(-1)
+    right.delete(right.root, max(keys))
+    left.validate()
+    right.validate()
+    joined = cls.join(left, 5000, right)
+    assert list(joined) == sorted(set(keys) - {max(keys)} | {-1, 5000})
+    assert len(joined) == len(keys) + 1
+    joined.validate()
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 2026
+
+@author: Michael Lin
+"""
+from RedBlackBinaryTree.PersistentRedBlackTree import PersistentRedBlackTree
+from RedBlackBinaryTree.RedBlackBinaryTree import RedBlackBinaryTree
+
+
+def test_neighbour_searches_are_recorded():
+    tree = RedBlackBinaryTree.from_iterable(range(0, 100, 2))
+    tree.enable_stats()
+    assert tree.predecessor(51) == 50
+    assert tree.successor(50) == 52
+    assert tree.predecessor(0) is None
+    operations = tree.stats.operations
+    assert operations['predecessor'].calls == 2
+    assert operations['successor'].calls == 1
+    assert operations['successor'].nodes_visited >= 5
+    assert tree.stats.nodes_visited == sum(op.nodes_visited for op in operations.values())
+
+
+def test_persistent_batches_are_recorded():
+    tree = PersistentRedBlackTree()
+    tree.enable_stats()
+    tree.insert_many([5, 1, 9])
+    assert tree.delete_many([1, 7]) == 1
+    tree.delete(tree.root, 9)
+    operations = tree.stats.operations
+    assert (operations['insert_many'].calls, operations['delete_many'].calls, operations['delete'].calls) == (1, 1, 1)
+    assert list(tree) == [5]